@@ -1,12 +1,113 @@
+from argparse import ArgumentParser, Namespace
+from array import array
+from codecs import getincrementaldecoder
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from os import cpu_count
+from tempfile import TemporaryDirectory
+from time import monotonic
+from typing import BinaryIO
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 from sys import stdin
 
+CHUNK_SIZE: int = 1 << 16
+IGNORED_SYMBOLS: str = " \n"
+IGNORED_BYTES: bytes = IGNORED_SYMBOLS.encode()
+NON_ASCII_SYMBOL: str = "\ufffd"
+
 
 def get_input_value() -> str:
     return stdin.read()
 
 
+def get_input_chunks(chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    chunk: str = stdin.read(chunk_size)
+    while chunk:
+        yield chunk
+        chunk = stdin.read(chunk_size)
+
+
+def count_symbols(chunks: Iterable[str]) -> Counter[str]:
+    counter: Counter[str] = Counter()
+    chunk: str
+    for chunk in chunks:
+        counter.update(chunk)
+
+    symbol: str
+    for symbol in IGNORED_SYMBOLS:
+        del counter[symbol]
+
+    return counter
+
+
+def find_shard_bounds(data: bytes | mmap, amount_of_shards: int) -> list[tuple[int, int]]:
+    size: int = len(data)
+    offsets: list[int] = [0]
+
+    shard_index: int
+    for shard_index in range(1, amount_of_shards):
+        position: int = max(size * shard_index // amount_of_shards, offsets[-1])
+        while position < size and data[position] & 0xC0 == 0x80:
+            position += 1
+        if offsets[-1] < position < size:
+            offsets.append(position)
+    offsets.append(size)
+
+    return list(zip(offsets, offsets[1:]))
+
+
+def iter_shard_chunks(data: bytes | mmap, start: int, end: int, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    decoder = getincrementaldecoder("utf-8")()
+    position: int
+    for position in range(start, end, chunk_size):
+        yield decoder.decode(data[position : min(position + chunk_size, end)])
+    yield decoder.decode(b"", final=True)
+
+
+def count_file_shard(path: str, start: int, end: int) -> Counter[str]:
+    with open(path, "rb") as file, mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+        return count_symbols(iter_shard_chunks(data, start, end))
+
+
+def count_file_symbols(path: str, workers: int | None = None) -> dict[str, int]:
+    workers = workers or cpu_count() or 1
+    with open(path, "rb") as file:
+        if not file.seek(0, 2):
+            return {}
+        with mmap(file.fileno(), 0, access=ACCESS_READ) as data:
+            bounds: list[tuple[int, int]] = find_shard_bounds(data, workers)
+
+    starts: tuple[int, ...]
+    ends: tuple[int, ...]
+    starts, ends = zip(*bounds)
+
+    counter: Counter[str] = Counter()
+    with ProcessPoolExecutor(max_workers=len(bounds)) as executor:
+        partial: Counter[str]
+        for partial in executor.map(count_file_shard, [path] * len(bounds), starts, ends):
+            counter.update(partial)
+
+    return dict(sorted(counter.items()))
+
+
+def parse_arguments(arguments: list[str] | None = None) -> Namespace:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("path", nargs="?")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--height", type=int, default=None)
+    parser.add_argument("--bytes", action="store_true")
+    parser.add_argument("--window", type=int, default=None)
+    parser.add_argument("--seconds", type=float, default=None)
+    namespace: Namespace = parser.parse_args(arguments)
+    if namespace.height is not None and namespace.height < 1:
+        parser.error("--height must be at least 1")
+    return namespace
+
+
 class SymbolStat:
     def __init__(self, symbol: str, amount: int) -> None:
         self.__symbol: str = symbol
@@ -17,30 +118,21 @@ class SymbolStat:
 
 
 class SymbolStatsBuilder:
-    def __init__(self, string: str) -> None:
-        self.__string: str = string
-        self.__letters: list[str]
-        self.__amounts: list[int]
+    def __init__(self, string: str | Iterable[str]) -> None:
+        self.__chunks: Iterable[str] = [string] if isinstance(string, str) else string
+        self.__amounts: Counter[str]
         self.__data: list[SymbolStat]
 
-    def __remove_spaces(self) -> None:
-        self.__string = self.__string.replace(" ", "").replace("\n", "")
-
-    def __define_letters(self) -> None:
-        self.__letters = list(set(self.__string))
-
     def __define_amounts(self) -> None:
-        self.__amounts = list(map(lambda letter: self.__string.count(letter), self.__letters))
+        self.__amounts = count_symbols(self.__chunks)
 
     def __define_stats(self) -> None:
-        self.__data = [SymbolStat(self.__letters[i], self.__amounts[i]) for i in range(len(self.__letters))]
+        self.__data = [SymbolStat(letter, amount) for letter, amount in self.__amounts.items()]
 
     def __sort_stats(self) -> None:
         self.__data.sort(key=lambda item: item.get_stat()[0])
 
     def define_values(self) -> None:
-        self.__remove_spaces()
-        self.__define_letters()
         self.__define_amounts()
         self.__define_stats()
         self.__sort_stats()
@@ -55,46 +147,128 @@ class SymbolStatsBuilder:
         return new_data
 
 
-class HistogramBuilder:
-    def __init__(self, symbol_stats: dict[str, int]):
-        self.__symbol_stats: dict[str, int] = symbol_stats
-        self.__build_table()
-
-    def __build_table(self):
-        raw_table: list[list[str]] = []
-        max_width: int = max([item[1] for item in self.__symbol_stats.items()])
-        item: tuple[str, int]
-        for item in self.__symbol_stats.items():
-            record: list[str] = [item[0]]
-            record.extend(list(item[1] * "#" + (max_width - item[1]) * " "))
-            raw_table.append(record)
-
-        self.__table: list[list[str]] = self.__rotate_table(raw_table, max_width)
-        self.__table.reverse()
-
-    def __rotate_table(self, raw_table: list[list[str]], max_width: int) -> list[list[str]]:
-        table: list[list[str]] = [[None] * len(raw_table)] * (max_width + 1)
-        for i in range(len(table)):
-            record: list[str] = []
-            for j in range(len(raw_table)):
-                record.append(raw_table[j][i])
-            table[i] = record
-
-        return table
+class ByteStatsBuilder:
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self.__stream: BinaryIO = stream
+        self.__chunk_size: int = chunk_size
+        self.__amounts: array = array("q", [0]) * 256
 
-    def __str__(self):
-        return "\n".join("".join(row) for row in self.__table)
+    def define_values(self) -> None:
+        chunk: bytes = self.__stream.read(self.__chunk_size)
+        while chunk:
+            value: int
+            amount: int
+            for value, amount in Counter(chunk).items():
+                self.__amounts[value] += amount
+            chunk = self.__stream.read(self.__chunk_size)
 
+        for value in IGNORED_BYTES:
+            self.__amounts[value] = 0
 
-def main() -> None:
+    def build_symbol_stats(self) -> dict[str, int]:
+        symbol_stats: dict[str, int] = {
+            chr(value): amount for value, amount in enumerate(self.__amounts[:128]) if amount
+        }
+        non_ascii: int = sum(self.__amounts[128:])
+        if non_ascii:
+            symbol_stats[NON_ASCII_SYMBOL] = non_ascii
+        return symbol_stats
+
+
+class WindowedSymbolStats:
+    def __init__(
+        self,
+        max_symbols: int | None = None,
+        max_seconds: float | None = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.__max_symbols: int | None = max_symbols
+        self.__max_seconds: float | None = max_seconds
+        self.__clock: Callable[[], float] = clock
+        self.__window: deque[tuple[float, str]] = deque()
+        self.__amounts: dict[str, int] = {}
+
+    def __drop_oldest(self) -> None:
+        symbol: str = self.__window.popleft()[1]
+        self.__amounts[symbol] -= 1
+        if not self.__amounts[symbol]:
+            del self.__amounts[symbol]
+
+    def __expire(self, moment: float) -> None:
+        if self.__max_seconds is None:
+            return
+        while self.__window and self.__window[0][0] <= moment - self.__max_seconds:
+            self.__drop_oldest()
+
+    def push(self, chunk: str) -> None:
+        moment: float = self.__clock()
+        self.__expire(moment)
+
+        symbol: str
+        for symbol in chunk:
+            if symbol in IGNORED_SYMBOLS:
+                continue
+            self.__window.append((moment, symbol))
+            self.__amounts[symbol] = self.__amounts.get(symbol, 0) + 1
+            if self.__max_symbols is not None and len(self.__window) > self.__max_symbols:
+                self.__drop_oldest()
+
+    def build_symbol_stats(self) -> dict[str, int]:
+        self.__expire(self.__clock())
+        return dict(sorted(self.__amounts.items()))
 
-    string: str = get_input_value()
 
-    stats: SymbolStatsBuilder = SymbolStatsBuilder(string)
-    stats.define_values()
+class HistogramBuilder:
+    def __init__(self, symbol_stats: dict[str, int], max_height: int | None = None):
+        self.__symbols: str = "".join(symbol_stats)
+        self.__heights: list[int] = self.__scale_heights(list(symbol_stats.values()), max_height)
+
+    @staticmethod
+    def __scale_heights(amounts: list[int], max_height: int | None) -> list[int]:
+        max_amount: int = max(amounts)
+        if max_height is None or max_amount <= max_height:
+            return amounts
+        return [-(-amount * max_height // max_amount) for amount in amounts]
+
+    def iter_rows(self) -> Iterator[str]:
+        level: int
+        for level in range(max(self.__heights), 0, -1):
+            yield "".join("#" if height >= level else " " for height in self.__heights)
+        yield self.__symbols
 
-    histogram: HistogramBuilder = HistogramBuilder(stats.build_symbol_stats())
-    print(str(histogram))
+    def __str__(self):
+        return "\n".join(self.iter_rows())
+
+
+def main() -> None:
+    arguments: Namespace = parse_arguments()
+
+    if arguments.window is not None or arguments.seconds is not None:
+        window: WindowedSymbolStats = WindowedSymbolStats(arguments.window, arguments.seconds)
+        line: str
+        for line in iter(stdin.readline, ""):
+            window.push(line)
+            window_stats: dict[str, int] = window.build_symbol_stats()
+            if window_stats:
+                print(HistogramBuilder(window_stats, arguments.height), end="\n\n", flush=True)
+        return
+
+    symbol_stats: dict[str, int]
+    if arguments.path:
+        symbol_stats = count_file_symbols(arguments.path, arguments.workers)
+    elif arguments.bytes:
+        byte_stats: ByteStatsBuilder = ByteStatsBuilder(stdin.buffer)
+        byte_stats.define_values()
+        symbol_stats = byte_stats.build_symbol_stats()
+    else:
+        stats: SymbolStatsBuilder = SymbolStatsBuilder(get_input_chunks())
+        stats.define_values()
+        symbol_stats = stats.build_symbol_stats()
+
+    histogram: HistogramBuilder = HistogramBuilder(symbol_stats, arguments.height)
+    row: str
+    for row in histogram.iter_rows():
+        print(row)
 
 
 class TestSymbolStat(TestCase):
@@ -116,6 +290,82 @@ class TestSymbolStatBuilder(TestCase):
             {"t": 3, "e": 1, "s": 2, "r": 1, "i": 1, "n": 1, "g": 1},
         )
 
+    def test_building_from_chunks(self) -> None:
+        builder: SymbolStatsBuilder = SymbolStatsBuilder(["te", "st\n st", "ring"])
+        builder.define_values()
+        self.assertEqual(
+            builder.build_symbol_stats(),
+            {"t": 3, "e": 1, "s": 2, "r": 1, "i": 1, "n": 1, "g": 1},
+        )
+
+
+class TestByteStatsBuilder(TestCase):
+    def setUp(self) -> None:
+        self.__builder: ByteStatsBuilder = ByteStatsBuilder(BytesIO(b"test\n string"), 4)
+        self.__builder.define_values()
+
+    def test_building(self) -> None:
+        self.assertEqual(
+            list(self.__builder.build_symbol_stats().items()),
+            [("e", 1), ("g", 1), ("i", 1), ("n", 1), ("r", 1), ("s", 2), ("t", 3)],
+        )
+
+    def test_non_ascii_bytes(self) -> None:
+        builder: ByteStatsBuilder = ByteStatsBuilder(BytesIO("тt ✓".encode()))
+        builder.define_values()
+        self.assertEqual(builder.build_symbol_stats(), {"t": 1, NON_ASCII_SYMBOL: 5})
+
+
+class TestWindowedSymbolStats(TestCase):
+    def setUp(self) -> None:
+        self.__moment: float = 0.0
+
+    def __clock(self) -> float:
+        return self.__moment
+
+    def test_symbol_window(self) -> None:
+        window: WindowedSymbolStats = WindowedSymbolStats(max_symbols=4)
+        window.push("aab\n")
+        self.assertEqual(window.build_symbol_stats(), {"a": 2, "b": 1})
+        window.push("c d")
+        self.assertEqual(window.build_symbol_stats(), {"a": 1, "b": 1, "c": 1, "d": 1})
+
+    def test_time_window(self) -> None:
+        window: WindowedSymbolStats = WindowedSymbolStats(max_seconds=10, clock=self.__clock)
+        window.push("ab")
+        self.__moment = 5
+        window.push("bc")
+        self.assertEqual(window.build_symbol_stats(), {"a": 1, "b": 2, "c": 1})
+        self.__moment = 12
+        self.assertEqual(window.build_symbol_stats(), {"b": 1, "c": 1})
+
+
+class TestFileCounting(TestCase):
+    def setUp(self) -> None:
+        self.__data: bytes = "тест test\nstring ✓✓".encode()
+
+    def test_shard_bounds(self) -> None:
+        bounds: list[tuple[int, int]] = find_shard_bounds(self.__data, 7)
+        self.assertEqual(bounds[0][0], 0)
+        self.assertEqual(bounds[-1][1], len(self.__data))
+        self.assertEqual(
+            "".join(self.__data[start:end].decode() for start, end in bounds),
+            self.__data.decode(),
+        )
+
+    def test_shard_chunks(self) -> None:
+        self.assertEqual("".join(iter_shard_chunks(self.__data, 0, len(self.__data), 3)), self.__data.decode())
+
+    def test_count_file_symbols(self) -> None:
+        with TemporaryDirectory() as directory:
+            path: str = f"{directory}/input.txt"
+            with open(path, "wb") as file:
+                file.write(self.__data)
+            self.assertEqual(
+                count_file_symbols(path, 3),
+                {"e": 1, "g": 1, "i": 1, "n": 1, "r": 1, "s": 2, "t": 3, "е": 1, "с": 1, "т": 2, "✓": 2},
+            )
+
 
 class TestHistogramBuilder(TestCase):
     def setUp(self):
@@ -124,6 +374,18 @@ class TestHistogramBuilder(TestCase):
     def test_histogram(self):
         self.assertEqual(str(self.__builder), "      #\n     ##\n#######\neginrst")
 
+    def test_height_above_amounts(self):
+        builder: HistogramBuilder = HistogramBuilder({"e": 1, "s": 2, "t": 3}, 10)
+        self.assertEqual(str(builder), "  #\n ##\n###\nest")
+
+    def test_scaled_histogram(self):
+        builder: HistogramBuilder = HistogramBuilder({"a": 10_000_000, "b": 5_000_000, "c": 1}, 4)
+        self.assertEqual(list(builder.iter_rows()), ["#  ", "#  ", "## ", "###", "abc"])
+
+    def test_incorrect_height(self):
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            parse_arguments(["--height", "0"])
+
 
 class TestInput(TestCase):
     @patch("sys.stdin.read", return_value="test test test test\n     test\n\n")
@@ -131,6 +393,11 @@ class TestInput(TestCase):
         self.assertEqual(get_input_value(), "test test test test\n     test\n\n")
         input_mock.assert_called_once_with()
 
+    @patch("sys.stdin.read", side_effect=["test ", "test\n", ""])
+    def test_get_input_chunks(self, input_mock: MagicMock) -> None:
+        self.assertEqual(list(get_input_chunks(5)), ["test ", "test\n"])
+        input_mock.assert_called_with(5)
+
 
 if __name__ == "__main__":
     main()
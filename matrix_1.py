@@ -1,6 +1,19 @@
-from unittest import TestCase
+from abc import ABC, abstractmethod
+from argparse import ArgumentParser, Namespace
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from heapq import heapify, heappop, heappush
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipIf
 from unittest.mock import MagicMock, patch
 
+from matrix_core import BinaryMatrix, BulkReader, get_row
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 def read_amounts() -> tuple[int, int]:
     raw_string: list[str] = input().split()
@@ -26,36 +39,332 @@ def read_data(amount_of_strings: int, amount_of_rows: int) -> list[list[int]]:
     return matrix
 
 
-class Matrix:
+class Storage(ABC):
+    @abstractmethod
+    def get_shape(self) -> tuple[int, int]: ...
+
+    @abstractmethod
+    def get_string(self, string_index: int) -> Sequence[int]: ...
+
+    @abstractmethod
+    def get_column(self, column_index: int) -> list[int]: ...
+
+    @abstractmethod
+    def select_columns(self, column_indexes: Iterable[int]) -> "Storage": ...
+
+    def set_value(self, string_index: int, row_index: int, value: int) -> None:
+        raise TypeError
+
+    def append_string(self, string: list[int]) -> None:
+        raise TypeError
+
+    def iter_strings(self) -> Iterator[Sequence[int]]:
+        return map(self.get_string, range(self.get_shape()[0]))
+
+    def to_list(self) -> list[list[int]]:
+        return [list(string) for string in self.iter_strings()]
+
+
+class ListStorage(Storage):
     def __init__(self, data: list[list[int]]) -> None:
         self.__data: list[list[int]] = data
 
+    def get_shape(self) -> tuple[int, int]:
+        return (len(self.__data), len(self.__data[0]) if self.__data else 0)
+
+    def get_string(self, string_index: int) -> list[int]:
+        return self.__data[string_index]
+
+    def get_column(self, column_index: int) -> list[int]:
+        return get_row(self.__data, column_index)
+
+    def select_columns(self, column_indexes: Iterable[int]) -> "ListStorage":
+        return ListStorage([self.get_column(j) for j in column_indexes])
+
+    def set_value(self, string_index: int, row_index: int, value: int) -> None:
+        self.__data[string_index][row_index] = value
+
+    def append_string(self, string: list[int]) -> None:
+        self.__data.append(string)
+
+    def to_list(self) -> list[list[int]]:
+        return self.__data
+
+
+class ArrayStorage(Storage):
+    def __init__(self, values: array, amount_of_rows: int) -> None:
+        self.__values: array = values
+        self.__amount_of_rows: int = amount_of_rows
+
+    @staticmethod
+    def from_list(data: list[list[int]]) -> "ArrayStorage":
+        values: array = array("q")
+        string: list[int]
+        for string in data:
+            values.extend(string)
+        return ArrayStorage(values, len(data[0]) if data else 0)
+
+    def get_shape(self) -> tuple[int, int]:
+        if not self.__amount_of_rows:
+            return (0, 0)
+        return (len(self.__values) // self.__amount_of_rows, self.__amount_of_rows)
+
+    def get_string(self, string_index: int) -> memoryview:
+        start: int = string_index * self.__amount_of_rows
+        return memoryview(self.__values)[start : start + self.__amount_of_rows]
+
+    def get_column(self, column_index: int) -> list[int]:
+        return self.__values[column_index :: self.__amount_of_rows].tolist()
+
+    def select_columns(self, column_indexes: Iterable[int]) -> "ArrayStorage":
+        values: array = array("q")
+        column_index: int
+        for column_index in column_indexes:
+            values.extend(self.__values[column_index :: self.__amount_of_rows])
+        return ArrayStorage(values, self.get_shape()[0])
+
+    def set_value(self, string_index: int, row_index: int, value: int) -> None:
+        if row_index >= self.__amount_of_rows:
+            raise IndexError
+        self.__values[string_index * self.__amount_of_rows + row_index] = value
+
+    def append_string(self, string: list[int]) -> None:
+        if not self.__values:
+            self.__amount_of_rows = len(string)
+        self.__values.extend(string)
+
+
+class NumpyStorage(Storage):
+    def __init__(self, values: "numpy.ndarray") -> None:
+        self.__values: numpy.ndarray = values
+
+    @staticmethod
+    def from_list(data: list[list[int]]) -> "NumpyStorage":
+        if numpy is None:
+            raise ImportError("numpy is required for the numpy backend")
+        return NumpyStorage(numpy.array(data, dtype=numpy.int64).reshape(len(data), -1))
+
+    def get_shape(self) -> tuple[int, int]:
+        return self.__values.shape
+
+    def get_string(self, string_index: int) -> list[int]:
+        return self.__values[string_index].tolist()
+
+    def get_column(self, column_index: int) -> list[int]:
+        return self.__values[:, column_index].tolist()
+
+    def select_columns(self, column_indexes: Iterable[int]) -> "NumpyStorage":
+        return NumpyStorage(self.__values[:, list(column_indexes)].T.copy())
+
+    def set_value(self, string_index: int, row_index: int, value: int) -> None:
+        self.__values[string_index, row_index] = value
+
+    def append_string(self, string: list[int]) -> None:
+        self.__values = numpy.vstack([self.__values, numpy.array([string], dtype=numpy.int64)])
+
+
+class MemoryMappedStorage(Storage):
+    def __init__(self, path: str) -> None:
+        self.__matrix: BinaryMatrix = BinaryMatrix.open(path)
+        self.__shape: tuple[int, int] = self.__matrix.get_shape()
+        self.__values: memoryview = self.__matrix.get_values()
+
+    @staticmethod
+    def write(path: str, data: list[list[int]]) -> None:
+        with open(path, "wb") as file:
+            BinaryMatrix.write(file, data)
+
+    def get_shape(self) -> tuple[int, int]:
+        return self.__shape
+
+    def get_string(self, string_index: int) -> memoryview:
+        start: int = string_index * self.__shape[1]
+        return self.__values[start : start + self.__shape[1]]
+
+    def get_column(self, column_index: int) -> list[int]:
+        return self.__values[column_index :: self.__shape[1]].tolist()
+
+    def select_columns(self, column_indexes: Iterable[int]) -> ArrayStorage:
+        values: array = array("q")
+        column_index: int
+        for column_index in column_indexes:
+            values.extend(self.__values[column_index :: self.__shape[1]])
+        return ArrayStorage(values, self.__shape[0])
+
+
+BACKENDS: dict[str, Callable[[list[list[int]]], Storage]] = {
+    "list": ListStorage,
+    "array": ArrayStorage.from_list,
+    "numpy": NumpyStorage.from_list,
+}
+
+
+class MaxIndex:
+    def __init__(self) -> None:
+        self.__columns: dict[int, dict[int, int]] = {}
+        self.__heap: list[int] = []
+
+    def add(self, value: int, row_index: int) -> None:
+        if value not in self.__columns:
+            self.__columns[value] = {}
+            heappush(self.__heap, -value)
+            if len(self.__heap) > 2 * len(self.__columns):
+                self.__heap = [-live_value for live_value in self.__columns]
+                heapify(self.__heap)
+        columns: dict[int, int] = self.__columns[value]
+        columns[row_index] = columns.get(row_index, 0) + 1
+
+    def remove(self, value: int, row_index: int) -> None:
+        columns: dict[int, int] = self.__columns[value]
+        columns[row_index] -= 1
+        if not columns[row_index]:
+            del columns[row_index]
+        if not columns:
+            del self.__columns[value]
+
+    def get_max(self) -> int:
+        while self.__heap and -self.__heap[0] not in self.__columns:
+            heappop(self.__heap)
+        if not self.__heap:
+            raise ValueError
+        return -self.__heap[0]
+
+    def get_columns(self) -> list[int]:
+        return sorted(self.__columns[self.get_max()])
+
+
+class Matrix:
+    def __init__(self, data: list[list[int]] | Storage) -> None:
+        self.__storage: Storage = data if isinstance(data, Storage) else ListStorage(data)
+        self.__max_index: MaxIndex | None = None
+
+    def __get_max_index(self) -> MaxIndex:
+        if self.__max_index is None:
+            self.__max_index = MaxIndex()
+            string: Sequence[int]
+            for string in self.__storage.iter_strings():
+                row_index: int
+                value: int
+                for row_index, value in enumerate(string):
+                    self.__max_index.add(value, row_index)
+        return self.__max_index
+
+    def __set_storage(self, storage: Storage) -> None:
+        self.__storage = storage
+        self.__max_index = None
+
+    def append_string(self, string: list[int]) -> None:
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = self.__storage.get_shape()
+        if amount_of_strings and len(string) != amount_of_rows:
+            raise ValueError
+        max_index: MaxIndex = self.__get_max_index()
+        self.__storage.append_string(string)
+
+        row_index: int
+        value: int
+        for row_index, value in enumerate(string):
+            max_index.add(value, row_index)
+
+    def set_value(self, string_index: int, row_index: int, value: int) -> None:
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = self.__storage.get_shape()
+        if not (
+            0 <= string_index < amount_of_strings and 0 <= row_index < amount_of_rows
+        ):
+            raise IndexError
+        max_index: MaxIndex = self.__get_max_index()
+        previous: int = self.__storage.get_string(string_index)[row_index]
+        self.__storage.set_value(string_index, row_index, value)
+        max_index.remove(previous, row_index)
+        max_index.add(value, row_index)
+
     def __str__(self):
-        return "".join("".join(map(str, row)) for row in self.__data)
+        return "".join("".join(map(str, row)) for row in self.__storage.iter_strings())
 
     def get_data(self) -> list[list[int]]:
-        return self.__data
+        return self.__storage.to_list()
 
     def find_max(self) -> int:
-        if not sum(len(string) for string in self.__data):
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = self.__storage.get_shape()
+        if not amount_of_strings * amount_of_rows:
             raise ValueError
-        return max(max(string) for string in self.__data)
+        if self.__max_index is not None:
+            return self.__max_index.get_max()
+        return max(max(string) for string in self.__storage.iter_strings())
 
     def get_row(self, row_index: int) -> list[int]:
-        if row_index >= len(self.__data[0]):
+        if row_index >= self.__storage.get_shape()[1]:
             raise ValueError
-        return [self.__data[i][row_index] for i in range(len(self.__data))]
+        return self.__storage.get_column(row_index)
 
     def rotate_matrix(self) -> None:
-        self.__data = [self.get_row(j) for j in range(len(self.__data[0]))]
+        self.__set_storage(self.__storage.select_columns(range(self.__storage.get_shape()[1])))
+
+    def find_columns_with_max(self) -> list[int]:
+        if self.__max_index is not None:
+            return self.__max_index.get_columns()
+
+        maximum: int | None = None
+        columns: set[int] = set()
+
+        string: Sequence[int]
+        for string in self.__storage.iter_strings():
+            if not string:
+                continue
+            string_max: int = max(string)
+            if maximum is None or string_max > maximum:
+                maximum = string_max
+                columns = set()
+            if string_max == maximum:
+                columns.update(j for j, value in enumerate(string) if value == maximum)
+
+        if maximum is None:
+            raise ValueError
+        return sorted(columns)
 
     def find_row_with_max(self) -> None:
-        self.rotate_matrix()
-        self.__data = list(filter(lambda row: self.find_max() in row, self.__data))
+        if not self.__storage.get_shape()[1]:
+            self.__set_storage(ListStorage([]))
+            return
+        self.__set_storage(self.__storage.select_columns(self.find_columns_with_max()))
+
+
+def parse_arguments(arguments: list[str] | None = None) -> Namespace:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("--backend", choices=[*BACKENDS, "mmap"], default="list")
+    parser.add_argument("--path", default=None)
+    namespace: Namespace = parser.parse_args(arguments)
+    if namespace.backend == "mmap" and namespace.path is None:
+        parser.error("--backend mmap requires --path")
+    return namespace
 
 
 def main() -> None:
-    matrix: Matrix = Matrix(read_data(*read_amounts()))
+    arguments: Namespace = parse_arguments()
+
+    storage: Storage
+    if arguments.backend == "mmap":
+        storage = MemoryMappedStorage(arguments.path)
+    elif arguments.path is not None:
+        with BinaryMatrix.open(arguments.path) as binary:
+            storage = ArrayStorage(array("q", binary.get_values()), binary.get_shape()[1])
+    else:
+        reader: BulkReader = BulkReader()
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = reader.read_amounts()
+        storage = ArrayStorage(
+            reader.read_int_matrix(amount_of_strings, amount_of_rows), amount_of_rows
+        )
+    if arguments.backend not in ("array", "mmap"):
+        storage = BACKENDS[arguments.backend](storage.to_list())
+
+    matrix: Matrix = Matrix(storage)
     matrix.find_row_with_max()
     print(matrix)
 
@@ -122,6 +431,15 @@ class TestMatrix(TestCase):
     def test_get_row(self) -> None:
         self.assertEqual(self.__matrix.get_row(1), [121, 121, 321])
 
+    def test_find_columns_with_max(self) -> None:
+        self.assertEqual(self.__matrix.find_columns_with_max(), [3])
+
+    def test_find_columns_with_max_ties(self) -> None:
+        matrix: Matrix = Matrix([[1, 7, 3], [7, 2, 0], [4, 7, 5]])
+        self.assertEqual(matrix.find_columns_with_max(), [0, 1])
+        matrix.find_row_with_max()
+        self.assertEqual(matrix.get_data(), [[1, 7, 4], [7, 2, 7]])
+
     def test_find_row_with_max(self) -> None:
         self.__matrix.find_row_with_max()
         self.assertEqual(
@@ -130,3 +448,115 @@ class TestMatrix(TestCase):
                 [119, 119, 542],
             ],
         )
+
+
+class TestMaxIndex(TestCase):
+    def setUp(self) -> None:
+        self.__matrix: Matrix = Matrix([[1, 9, 3], [9, 2, 4]])
+
+    def test_append_string(self) -> None:
+        self.__matrix.append_string([5, 6, 9])
+        self.assertEqual(self.__matrix.find_max(), 9)
+        self.assertEqual(self.__matrix.find_columns_with_max(), [0, 1, 2])
+        self.__matrix.append_string([10, 0, 0])
+        self.assertEqual(self.__matrix.find_max(), 10)
+        self.assertEqual(self.__matrix.find_columns_with_max(), [0])
+
+    def test_append_incorrect_string(self) -> None:
+        with self.assertRaises(ValueError):
+            self.__matrix.append_string([1, 2])
+
+    def test_overwrite_max(self) -> None:
+        self.__matrix.set_value(0, 1, 0)
+        self.assertEqual(self.__matrix.find_columns_with_max(), [0])
+        self.__matrix.set_value(1, 0, 1)
+        self.assertEqual(self.__matrix.find_max(), 4)
+        self.assertEqual(self.__matrix.find_columns_with_max(), [2])
+        self.__matrix.find_row_with_max()
+        self.assertEqual(self.__matrix.get_data(), [[3, 4]])
+
+    def test_set_incorrect_index(self) -> None:
+        self.__matrix.set_value(0, 1, 5)
+        with self.assertRaises(IndexError):
+            self.__matrix.set_value(0, -1, 7)
+        with self.assertRaises(IndexError):
+            self.__matrix.set_value(2, 0, 7)
+        self.assertEqual(self.__matrix.get_data(), [[1, 5, 3], [9, 2, 4]])
+        self.assertEqual(self.__matrix.find_max(), 9)
+
+    def test_heap_stays_bounded(self) -> None:
+        index: MaxIndex = MaxIndex()
+        value: int
+        for value in range(4):
+            index.add(value, value)
+        for value in range(40000):
+            index.remove(value % 4, value % 4)
+            index.add(value % 4, value % 4)
+        self.assertEqual(index.get_max(), 3)
+        self.assertLessEqual(len(index._MaxIndex__heap), 8)
+
+    def test_array_storage(self) -> None:
+        matrix: Matrix = Matrix(ArrayStorage.from_list([[1, 9, 3], [9, 2, 4]]))
+        matrix.set_value(1, 0, 11)
+        matrix.append_string([11, 0, 0])
+        self.assertEqual(matrix.find_max(), 11)
+        self.assertEqual(matrix.get_data(), [[1, 9, 3], [11, 2, 4], [11, 0, 0]])
+
+
+class TestStorages(TestCase):
+    def setUp(self) -> None:
+        self.__data: list[list[int]] = [
+            [123, 121, 120, 119],
+            [457, 121, 222, 542],
+            [123, 321, 120, 542],
+        ]
+        self.__directory: TemporaryDirectory = TemporaryDirectory()
+        self.__path: str = f"{self.__directory.name}/matrix.bin"
+        MemoryMappedStorage.write(self.__path, self.__data)
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def __check_storage(self, storage: Storage) -> None:
+        self.assertEqual(storage.get_shape(), (3, 4))
+        self.assertEqual(storage.to_list(), self.__data)
+
+        matrix: Matrix = Matrix(storage)
+        self.assertEqual(matrix.find_max(), 542)
+        self.assertEqual(matrix.get_row(1), [121, 121, 321])
+        matrix.find_row_with_max()
+        self.assertEqual(matrix.get_data(), [[119, 542, 542]])
+
+        matrix = Matrix(storage)
+        matrix.rotate_matrix()
+        self.assertEqual(
+            matrix.get_data(),
+            [[123, 457, 123], [121, 121, 321], [120, 222, 120], [119, 542, 542]],
+        )
+
+    def test_list_storage(self) -> None:
+        self.__check_storage(ListStorage(self.__data))
+
+    def test_array_storage(self) -> None:
+        self.__check_storage(ArrayStorage.from_list(self.__data))
+
+    @skipIf(numpy is None, "numpy is not installed")
+    def test_numpy_storage(self) -> None:
+        self.__check_storage(NumpyStorage.from_list(self.__data))
+
+    def test_memory_mapped_storage(self) -> None:
+        self.__check_storage(MemoryMappedStorage(self.__path))
+
+    def test_abstract_storage(self) -> None:
+        with self.assertRaises(TypeError):
+            Storage()
+
+    def test_mmap_backend_without_path(self) -> None:
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            parse_arguments(["--backend", "mmap"])
+
+    def test_incorrect_file(self) -> None:
+        with open(self.__path, "r+b") as file:
+            file.write(b"ABCD")
+        with self.assertRaises(ValueError):
+            MemoryMappedStorage(self.__path)
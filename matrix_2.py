@@ -1,6 +1,15 @@
+from argparse import ArgumentParser, Namespace
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heapreplace
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from matrix_core import BinaryMatrix, BulkReader, get_row, iter_columns, rotate_matrix
+
 
 def read_amounts() -> tuple[int, int]:
     raw_string: list[str] = input().split()
@@ -11,43 +20,195 @@ def read_amounts() -> tuple[int, int]:
     return tuple(map(int, raw_string))
 
 
-def read_data(amount_of_strings: int, amount_of_rows: int) -> list[list[int]]:
-    matrix: list[list[int]] = [[]] * amount_of_strings
-
-    string_index: int
-    for string_index in range(amount_of_strings):
+def iter_data(amount_of_strings: int, amount_of_rows: int) -> Iterator[list[int]]:
+    for _ in range(amount_of_strings):
         raw_string: str = input().split()
         if len(raw_string) != amount_of_rows:
             raise ValueError
         elif not all(substring.replace("-", "").isdigit() for substring in raw_string):
             raise TypeError
-        matrix[string_index] = list(map(int, raw_string))
+        yield list(map(int, raw_string))
 
-    return matrix
 
+def read_data(amount_of_strings: int, amount_of_rows: int) -> list[list[int]]:
+    return list(iter_data(amount_of_strings, amount_of_rows))
 
-def get_row(matrix: list[list[int]], row_index: int) -> list[int]:
-    if row_index >= len(matrix[0]):
-        raise ValueError
-    return [matrix[i][row_index] for i in range(len(matrix))]
 
+def find_max_min_in_row(matrix: list[list[int]]) -> list[tuple[int, int]]:
+    return [(max(row), min(row)) for row in iter_columns(matrix)]
 
-def rotate_matrix(matrix: list[list[int]]) -> list[list[int]]:
-    return [get_row(matrix, j) for j in range(len(matrix[0]))]
 
+def find_max_min_in_stream(strings: Iterable[list[int]]) -> list[tuple[int, int]]:
+    maximums: list[int] = []
+    minimums: list[int] = []
+
+    string: list[int]
+    for string in strings:
+        if not maximums:
+            maximums = list(string)
+            minimums = list(string)
+        else:
+            maximums = list(map(max, maximums, string))
+            minimums = list(map(min, minimums, string))
+
+    return list(zip(maximums, minimums))
+
+
+def push_bounded(heap: list[tuple[int, int]], item: tuple[int, int], size: int) -> None:
+    if len(heap) < size:
+        heappush(heap, item)
+    elif heap and item > heap[0]:
+        heapreplace(heap, item)
+
+
+def find_top_bottom_in_stream(
+    strings: Iterable[list[int]], k: int, with_indices: bool = False
+) -> list[tuple[list, list]]:
+    tops: list[list[tuple[int, int]]] = []
+    bottoms: list[list[tuple[int, int]]] = []
+
+    string_index: int
+    string: list[int]
+    for string_index, string in enumerate(strings):
+        if not tops:
+            tops = [[] for _ in string]
+            bottoms = [[] for _ in string]
+        column_index: int
+        value: int
+        for column_index, value in enumerate(string):
+            push_bounded(tops[column_index], (value, -string_index), k)
+            push_bounded(bottoms[column_index], (-value, -string_index), k)
+
+    answer: list[tuple[list, list]] = []
+    top: list[tuple[int, int]]
+    bottom: list[tuple[int, int]]
+    for top, bottom in zip(tops, bottoms):
+        top_items: list[tuple[int, int]] = [
+            (value, -index) for value, index in sorted(top, reverse=True)
+        ]
+        bottom_items: list[tuple[int, int]] = [
+            (-value, -index) for value, index in sorted(bottom, reverse=True)
+        ]
+        if with_indices:
+            answer.append((top_items, bottom_items))
+        else:
+            answer.append(
+                ([item[0] for item in top_items], [item[0] for item in bottom_items])
+            )
+
+    return answer
+
+
+def format_top_bottom(top: list[int], bottom: list[int]) -> str:
+    return " ".join(map(str, [*top, "|", *bottom]))
+
+
+def find_max_min_in_shared_columns(
+    name: str,
+    amount_of_strings: int,
+    amount_of_rows: int,
+    column_start: int,
+    column_end: int,
+) -> list[tuple[int, int]]:
+    memory: SharedMemory = SharedMemory(name=name)
+    data: memoryview = memory.buf[: amount_of_strings * amount_of_rows * 8]
+    values: memoryview = data.cast("q")
+    try:
+        answer: list[tuple[int, int]] = []
+        column_index: int
+        for column_index in range(column_start, column_end):
+            column: memoryview = values[column_index::amount_of_rows]
+            answer.append((max(column), min(column)))
+            column.release()
+        return answer
+    finally:
+        values.release()
+        data.release()
+        memory.close()
+
+
+def find_max_min_in_row_parallel(
+    matrix: list[list[int]], workers: int | None = None
+) -> list[tuple[int, int]]:
+    amount_of_rows: int = len(matrix[0]) if matrix else 0
+    if not amount_of_rows:
+        return []
+    workers = max(1, min(workers or cpu_count() or 1, amount_of_rows))
+
+    values: array = array("q")
+    string: list[int]
+    for string in matrix:
+        values.extend(string)
+
+    size: int = len(values) * values.itemsize
+    memory: SharedMemory = SharedMemory(create=True, size=size)
+    try:
+        memory.buf[:size] = memoryview(values).cast("B")
+        bounds: list[int] = [amount_of_rows * i // workers for i in range(workers + 1)]
+
+        answer: list[tuple[int, int]] = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            part: list[tuple[int, int]]
+            for part in executor.map(
+                find_max_min_in_shared_columns,
+                [memory.name] * workers,
+                [len(matrix)] * workers,
+                [amount_of_rows] * workers,
+                bounds[:-1],
+                bounds[1:],
+            ):
+                answer.extend(part)
+        return answer
+    finally:
+        memory.close()
+        memory.unlink()
 
-def find_max_min_in_row(matrix: list[list[int]]) -> list[tuple[int, int]]:
-    return [(max(row), min(row)) for row in rotate_matrix(matrix)]
+
+def parse_arguments(arguments: list[str] | None = None) -> Namespace:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=None)
+    parser.add_argument("--path", default=None)
+    namespace: Namespace = parser.parse_args(arguments)
+    if namespace.top is not None and namespace.top < 1:
+        parser.error("--top must be at least 1")
+    return namespace
 
 
 def main() -> None:
-    amount_of_strings: int
-    amount_of_rows: int
-    amount_of_strings, amount_of_rows = read_amounts()
-    matrix: list[list[int]] = read_data(amount_of_strings, amount_of_rows)
+    arguments: Namespace = parse_arguments()
+
+    binary: BinaryMatrix | None = None
+    strings: Iterator[Sequence[int]]
+    if arguments.path is not None:
+        binary = BinaryMatrix.open(arguments.path)
+        strings = binary.iter_strings()
+    else:
+        reader: BulkReader = BulkReader()
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = reader.read_amounts()
+        strings = reader.iter_int_strings(amount_of_strings, amount_of_rows, True)
+
+    try:
+        if arguments.top is not None:
+            top: list[int]
+            bottom: list[int]
+            for top, bottom in find_top_bottom_in_stream(strings, arguments.top):
+                print(format_top_bottom(top, bottom))
+            return
+
+        answer: list[tuple[int, int]]
+        if arguments.workers is not None:
+            answer = find_max_min_in_row_parallel(list(strings), arguments.workers)
+        else:
+            answer = find_max_min_in_stream(strings)
 
-    for row in find_max_min_in_row(matrix):
-        print(*row)
+        for row in answer:
+            print(*row)
+    finally:
+        if binary is not None:
+            binary.close()
 
 
 if __name__ == "__main__":
@@ -115,3 +276,75 @@ class TestMatrix(TestCase):
             find_max_min_in_row(self.__matrix),
             [(457, 123), (321, 121), (222, 120), (542, 119)],
         )
+
+    def test_find_max_min_in_stream(self) -> None:
+        self.assertEqual(
+            find_max_min_in_stream(iter(self.__matrix)),
+            find_max_min_in_row(self.__matrix),
+        )
+
+    def test_find_max_min_in_row_parallel(self) -> None:
+        self.assertEqual(
+            find_max_min_in_row_parallel(self.__matrix, 3),
+            find_max_min_in_row(self.__matrix),
+        )
+
+    def test_find_max_min_in_empty_matrix_parallel(self) -> None:
+        self.assertEqual(find_max_min_in_row_parallel([], 2), [])
+        self.assertEqual(find_max_min_in_row_parallel([[], []], 2), [])
+
+    def test_find_max_min_in_padded_shared_memory(self) -> None:
+        values: array = array("q", [-5, -2, -7, -1])
+        memory: SharedMemory = SharedMemory(create=True, size=len(values) * 8 + 64)
+        try:
+            memory.buf[: len(values) * 8] = memoryview(values).cast("B")
+            memory.buf[len(values) * 8 :] = bytes(64)
+            self.assertEqual(
+                find_max_min_in_shared_columns(memory.name, 2, 2, 0, 2),
+                [(-5, -7), (-1, -2)],
+            )
+        finally:
+            memory.close()
+            memory.unlink()
+
+    def test_find_top_bottom_in_stream(self) -> None:
+        self.assertEqual(
+            find_top_bottom_in_stream(iter(self.__matrix), 2),
+            [
+                ([457, 123], [123, 123]),
+                ([321, 121], [121, 121]),
+                ([222, 120], [120, 120]),
+                ([542, 119], [119, 119]),
+            ],
+        )
+
+    def test_find_top_bottom_with_indices(self) -> None:
+        self.assertEqual(
+            find_top_bottom_in_stream(iter(self.__matrix), 2, True)[1],
+            ([(321, 2), (121, 0)], [(121, 0), (121, 1)]),
+        )
+
+    def test_format_top_bottom(self) -> None:
+        self.assertEqual(format_top_bottom([5], [5]), "5 | 5")
+        self.assertEqual(format_top_bottom([], []), "|")
+
+    def test_find_top_bottom_without_items(self) -> None:
+        self.assertEqual(
+            find_top_bottom_in_stream(iter(self.__matrix), 0), [([], [])] * 4
+        )
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            parse_arguments(["--top", "0"])
+
+    def test_find_top_bottom_matches_max_min(self) -> None:
+        self.assertEqual(
+            [
+                (top[0], bottom[0])
+                for top, bottom in find_top_bottom_in_stream(self.__matrix, 1)
+            ],
+            find_max_min_in_row(self.__matrix),
+        )
+
+    @patch("builtins.input", side_effect=["1 -2", "-3 4"])
+    def test_find_max_min_in_input(self, mock_input: MagicMock) -> None:
+        self.assertEqual(find_max_min_in_stream(iter_data(2, 2)), [(1, -3), (4, -2)])
+        self.assertEqual(mock_input.call_count, 2)
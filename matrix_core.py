@@ -0,0 +1,338 @@
+from array import array
+from collections.abc import Iterator, Sequence
+from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from operator import itemgetter
+from re import Pattern, compile
+from struct import Struct
+from sys import byteorder, stdin
+from tempfile import TemporaryDirectory
+from typing import BinaryIO, TypeVar
+from unittest import TestCase
+
+T = TypeVar("T")
+
+SIGNED_PATTERN: Pattern[str] = compile(r"\s*-*\d[-\d]*(?:\s+-*\d[-\d]*)*\s*")
+BINARY_PATTERN: Pattern[str] = compile(r"\s*(?:01|[01])(?:\s+(?:01|[01]))*\s*")
+
+CHUNK_SIZE: int = 1 << 16
+
+MATRIX_MAGIC: bytes = b"MTRX"
+MATRIX_HEADER: Struct = Struct("<4sc3xQQ")
+MATRIX_DTYPES: tuple[str, ...] = ("q", "B")
+
+
+def get_row(matrix: Sequence[Sequence[T]], row_index: int) -> list[T]:
+    if row_index >= len(matrix[0]):
+        raise ValueError
+    return list(map(itemgetter(row_index), matrix))
+
+
+def iter_columns(matrix: Sequence[Sequence[T]]) -> Iterator[tuple[T, ...]]:
+    return zip(*matrix)
+
+
+def rotate_matrix(matrix: Sequence[Sequence[T]]) -> list[list[T]]:
+    return list(map(list, zip(*matrix)))
+
+
+def slice_matrix(
+    matrix: Sequence[Sequence[T]],
+    row_start: int,
+    column_start: int,
+    row_end: int,
+    column_end: int,
+) -> list[Sequence[T]]:
+    if (
+        row_start >= len(matrix)
+        or row_end >= len(matrix)
+        or column_start >= len(matrix[0])
+        or column_end >= len(matrix[0])
+    ):
+        raise IndexError
+    return [string[column_start : column_end + 1] for string in matrix[row_start : row_end + 1]]
+
+
+class BulkReader:
+    def __init__(
+        self, stream: BinaryIO | None = None, chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        self.__stream: BinaryIO = stream or stdin.buffer
+        self.__chunk_size: int = chunk_size
+        self.__lines: Iterator[bytes] = self.__iter_lines()
+
+    def __iter_lines(self) -> Iterator[bytes]:
+        parts: list[bytes] = []
+        while chunk := self.__stream.read(self.__chunk_size):
+            end: int = chunk.rfind(b"\n") + 1
+            if not end:
+                parts.append(chunk)
+                continue
+            parts.append(chunk[:end])
+            yield from b"".join(parts).splitlines()
+            parts = [chunk[end:]]
+        yield from b"".join(parts).splitlines()
+
+    def read_raw_line(self) -> bytes:
+        line: bytes | None = next(self.__lines, None)
+        if line is None:
+            raise EOFError
+        return line
+
+    def read_line(self) -> str:
+        return self.read_raw_line().decode()
+
+    def read_amounts(self) -> tuple[int, int]:
+        raw_string: list[str] = self.read_line().split()
+        if len(raw_string) != 2:
+            raise ValueError
+        elif not (raw_string[0].isdigit() and raw_string[1].isdigit()):
+            raise TypeError
+        return tuple(map(int, raw_string))
+
+    def __read_strings(
+        self, amount_of_strings: int, amount_of_rows: int, pattern: Pattern[str] | None
+    ) -> Iterator[list[str]]:
+        for _ in range(amount_of_strings):
+            line: str = self.read_line()
+            raw_string: list[str] = line.split()
+            if len(raw_string) != amount_of_rows:
+                raise ValueError
+            elif pattern is not None and not pattern.fullmatch(line):
+                raise TypeError
+            yield raw_string
+
+    def iter_int_strings(
+        self, amount_of_strings: int, amount_of_rows: int, signed: bool = False
+    ) -> Iterator[array]:
+        pattern: Pattern[str] | None = SIGNED_PATTERN if signed else None
+        raw_string: list[str]
+        for raw_string in self.__read_strings(amount_of_strings, amount_of_rows, pattern):
+            if not (signed or "".join(raw_string).isdigit()):
+                raise TypeError
+            yield array("q", map(int, raw_string))
+
+    def read_int_matrix(
+        self, amount_of_strings: int, amount_of_rows: int, signed: bool = False
+    ) -> array:
+        values: array = array("q")
+        string: array
+        for string in self.iter_int_strings(amount_of_strings, amount_of_rows, signed):
+            values.extend(string)
+        return values
+
+    def iter_str_matrix(
+        self, amount_of_strings: int, amount_of_rows: int, pattern: Pattern[str] | None = None
+    ) -> Iterator[list[str]]:
+        return self.__read_strings(amount_of_strings, amount_of_rows, pattern)
+
+    def read_str_matrix(
+        self, amount_of_strings: int, amount_of_rows: int, pattern: Pattern[str] | None = None
+    ) -> list[list[str]]:
+        return list(self.iter_str_matrix(amount_of_strings, amount_of_rows, pattern))
+
+
+def split_values(values: Sequence[T], amount_of_rows: int) -> Iterator[Sequence[T]]:
+    return (values[i : i + amount_of_rows] for i in range(0, len(values), amount_of_rows))
+
+
+class BinaryMatrix:
+    def __init__(self, data: bytes | mmap) -> None:
+        magic: bytes
+        dtype: bytes
+        amount_of_strings: int
+        amount_of_rows: int
+        magic, dtype, amount_of_strings, amount_of_rows = MATRIX_HEADER.unpack_from(data)
+        if magic != MATRIX_MAGIC or dtype.decode() not in MATRIX_DTYPES:
+            raise ValueError
+
+        self.__data: bytes | mmap = data
+        self.__dtype: str = dtype.decode()
+        self.__shape: tuple[int, int] = (amount_of_strings, amount_of_rows)
+        self.__values: memoryview = memoryview(data)[MATRIX_HEADER.size :].cast(self.__dtype)
+        if len(self.__values) != amount_of_strings * amount_of_rows:
+            raise ValueError
+        if byteorder == "big" and self.__dtype != "B":
+            values: array = array(self.__dtype, self.__values)
+            values.byteswap()
+            self.__values = memoryview(values)
+
+    @staticmethod
+    def open(path: str) -> "BinaryMatrix":
+        if path == "-":
+            return BinaryMatrix(stdin.buffer.read())
+        with open(path, "rb") as file:
+            return BinaryMatrix(mmap(file.fileno(), 0, access=ACCESS_READ))
+
+    @staticmethod
+    def write(stream: BinaryIO, matrix: Sequence[Sequence[int | str]]) -> None:
+        amount_of_rows: int = len(matrix[0]) if matrix else 0
+        dtype: str = "B" if matrix and isinstance(matrix[0][0], str) else "q"
+
+        values: array = array(dtype)
+        string: Sequence[int | str]
+        for string in matrix:
+            if len(string) != amount_of_rows:
+                raise ValueError
+            values.extend(map(ord, string) if dtype == "B" else string)
+        if byteorder == "big":
+            values.byteswap()
+
+        stream.write(MATRIX_HEADER.pack(MATRIX_MAGIC, dtype.encode(), len(matrix), amount_of_rows))
+        stream.write(values.tobytes())
+
+    def get_shape(self) -> tuple[int, int]:
+        return self.__shape
+
+    def get_dtype(self) -> str:
+        return self.__dtype
+
+    def get_values(self) -> memoryview:
+        return self.__values
+
+    def iter_strings(self) -> Iterator[memoryview]:
+        return split_values(self.__values, self.__shape[1]) if self.__shape[1] else iter(())
+
+    def iter_str_strings(self) -> Iterator[list[str]]:
+        string: memoryview
+        for string in self.iter_strings():
+            cells: list[str] = (
+                list(bytes(string).decode("latin-1"))
+                if self.__dtype == "B"
+                else list(map(str, string))
+            )
+            string.release()
+            yield cells
+
+    def to_str_matrix(self) -> list[list[str]]:
+        return list(self.iter_str_strings())
+
+    def close(self) -> None:
+        self.__values.release()
+        if isinstance(self.__data, mmap):
+            self.__data.close()
+
+    def __enter__(self) -> "BinaryMatrix":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+class TestMatrixCore(TestCase):
+    def setUp(self) -> None:
+        self.__matrix: list[list[int]] = [
+            [123, 121, 120, 119],
+            [457, 121, 222, 119],
+            [123, 321, 120, 542],
+        ]
+
+    def test_get_row(self) -> None:
+        self.assertEqual(get_row(self.__matrix, 1), [121, 121, 321])
+
+    def test_get_row_out_of_range(self) -> None:
+        with self.assertRaises(ValueError):
+            get_row(self.__matrix, 4)
+
+    def test_rotate_matrix(self) -> None:
+        self.assertEqual(
+            rotate_matrix(self.__matrix),
+            [[123, 457, 123], [121, 121, 321], [120, 222, 120], [119, 119, 542]],
+        )
+
+    def test_iter_columns(self) -> None:
+        self.assertEqual(next(iter_columns(self.__matrix)), (123, 457, 123))
+
+    def test_slice_matrix(self) -> None:
+        self.assertEqual(slice_matrix(self.__matrix, 1, 1, 2, 2), [[121, 222], [321, 120]])
+
+    def test_slice_huge_borders(self) -> None:
+        with self.assertRaises(IndexError):
+            slice_matrix(self.__matrix, 1, 1, 5, 5)
+
+
+class TestBulkReader(TestCase):
+    def test_read_int_matrix(self) -> None:
+        reader: BulkReader = BulkReader(BytesIO(b"2 3\n1 2 3\n4 5 6\n"))
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = reader.read_amounts()
+        values: array = reader.read_int_matrix(amount_of_strings, amount_of_rows)
+        self.assertEqual(values, array("q", [1, 2, 3, 4, 5, 6]))
+        self.assertEqual(list(map(list, split_values(values, 3))), [[1, 2, 3], [4, 5, 6]])
+
+    def test_read_in_chunks(self) -> None:
+        stream: BytesIO = BytesIO(b"3 2\r\n1 -2\n3 4\n-5 6")
+        reader: BulkReader = BulkReader(stream, 4)
+        self.assertEqual(reader.read_amounts(), (3, 2))
+        self.assertLess(stream.tell(), len(stream.getvalue()))
+        strings: Iterator[array] = reader.iter_int_strings(3, 2, True)
+        self.assertEqual(next(strings), array("q", [1, -2]))
+        self.assertLess(stream.tell(), len(stream.getvalue()))
+        self.assertEqual(list(strings), [array("q", [3, 4]), array("q", [-5, 6])])
+        with self.assertRaises(EOFError):
+            reader.read_line()
+
+    def test_read_signed_matrix(self) -> None:
+        reader: BulkReader = BulkReader(BytesIO(b"-1 2\n3 -4\n"))
+        self.assertEqual(reader.read_int_matrix(2, 2, True), array("q", [-1, 2, 3, -4]))
+
+    def test_incorrect_amounts(self) -> None:
+        with self.assertRaises(ValueError):
+            BulkReader(BytesIO(b"1 2 3\n")).read_amounts()
+        with self.assertRaises(TypeError):
+            BulkReader(BytesIO(b"a b\n")).read_amounts()
+
+    def test_incorrect_matrix(self) -> None:
+        with self.assertRaises(ValueError):
+            BulkReader(BytesIO(b"1 2 3\n")).read_int_matrix(1, 2)
+        with self.assertRaises(TypeError):
+            BulkReader(BytesIO(b"1 -2\n")).read_int_matrix(1, 2)
+        with self.assertRaises(TypeError):
+            BulkReader(BytesIO(b"1 -\n")).read_int_matrix(1, 2, True)
+        with self.assertRaises(TypeError):
+            BulkReader(BytesIO(b"1 2\n")).read_str_matrix(1, 2, BINARY_PATTERN)
+        with self.assertRaises(EOFError):
+            BulkReader(BytesIO(b"1 1\n")).read_int_matrix(2, 2)
+
+    def test_long_incorrect_signed_string(self) -> None:
+        line: bytes = b" ".join([b"123456"] * 40 + [b"12a"]) + b"\n"
+        with self.assertRaises(TypeError):
+            BulkReader(BytesIO(line)).read_int_matrix(1, 41, True)
+
+    def test_read_str_matrix(self) -> None:
+        self.assertEqual(
+            BulkReader(BytesIO(b"0 1\n1 01\n")).read_str_matrix(2, 2, BINARY_PATTERN),
+            [["0", "1"], ["1", "01"]],
+        )
+
+
+class TestBinaryMatrix(TestCase):
+    def setUp(self) -> None:
+        self.__directory: TemporaryDirectory = TemporaryDirectory()
+        self.__path: str = f"{self.__directory.name}/matrix.bin"
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_int_matrix(self) -> None:
+        with open(self.__path, "wb") as file:
+            BinaryMatrix.write(file, [[1, -2, 3], [4, 5, -6]])
+        with BinaryMatrix.open(self.__path) as matrix:
+            self.assertEqual(matrix.get_shape(), (2, 3))
+            self.assertEqual(matrix.get_dtype(), "q")
+            self.assertEqual(list(map(list, matrix.iter_strings())), [[1, -2, 3], [4, 5, -6]])
+
+    def test_str_matrix(self) -> None:
+        stream: BytesIO = BytesIO()
+        BinaryMatrix.write(stream, [["S", "a"], ["0", "1"]])
+        self.assertEqual(stream.getvalue()[MATRIX_HEADER.size :], b"Sa01")
+        matrix: BinaryMatrix = BinaryMatrix(stream.getvalue())
+        self.assertEqual(matrix.get_dtype(), "B")
+        self.assertEqual(matrix.to_str_matrix(), [["S", "a"], ["0", "1"]])
+
+    def test_incorrect_header(self) -> None:
+        with self.assertRaises(ValueError):
+            BinaryMatrix(MATRIX_HEADER.pack(b"ABCD", b"q", 0, 0))
+        with self.assertRaises(ValueError):
+            BinaryMatrix(MATRIX_HEADER.pack(MATRIX_MAGIC, b"q", 2, 2) + bytes(8))
@@ -1,6 +1,36 @@
+from argparse import ArgumentParser, Namespace
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dbm import open as open_database
+from hashlib import blake2b
+from io import BytesIO
+from itertools import islice
+from os import listdir
+from os.path import isfile, join
+from struct import error as StructError
+from tempfile import TemporaryDirectory
+from typing import TypeVar
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from matrix_core import (
+    BINARY_PATTERN,
+    MATRIX_MAGIC,
+    BinaryMatrix,
+    BulkReader,
+    get_row,
+    iter_columns,
+    rotate_matrix,
+)
+
+T = TypeVar("T")
+
+CACHE_SIZE: int = 4096
+BATCH_SIZE: int = 1024
+CHUNK_SIZE: int = 64
+ERROR_TYPE: str = "Error"
+
 
 def read_amounts() -> tuple[int, int]:
     raw_string: list[str] = input().split()
@@ -27,16 +57,6 @@ def read_data(amount_of_strings: int, amount_of_rows: int) -> list[list[str]]:
     return matrix
 
 
-def get_row(matrix: list[list[int]], row_index: int) -> list[int]:
-    if row_index >= len(matrix[0]):
-        raise ValueError
-    return [matrix[i][row_index] for i in range(len(matrix))]
-
-
-def rotate_matrix(matrix: list[list[int]]) -> list[list[int]]:
-    return [get_row(matrix, j) for j in range(len(matrix[0]))]
-
-
 def find_horizontal_lines(matrix: list[list[str]]) -> list[int]:
     answer: list[int] = []
     for i, row in enumerate(matrix):
@@ -48,13 +68,20 @@ def find_horizontal_lines(matrix: list[list[str]]) -> list[int]:
 
 def find_vertical_lines(matrix: list[list[str]]) -> list[int]:
     answer: list[int] = []
-    for j, column in enumerate(rotate_matrix(matrix)):
-        if not column.count("0"):
+    for j, column in enumerate(iter_columns(matrix)):
+        if "0" not in column:
             answer.append(j)
 
     return answer
 
 
+def pack_string(string: list[str]) -> int:
+    joined: str = "".join(string)
+    if len(joined) != len(string):
+        joined = "".join("0" if cell == "0" else "1" for cell in string)
+    return int(joined, 2) if joined else 0
+
+
 def find_distance(seq: list[int]) -> int:
     distance: int = seq[1] - seq[0] - 1 if len(seq) > 1 else 0
     for i in range(1, len(seq) - 1):
@@ -87,26 +114,262 @@ def is_vertical_line(horizontal: list[int], vertical: list[int], height: int) ->
     return vertical and not horizontal and height > find_distance(vertical) > 0
 
 
-def define_type(matrix: list[list[str]]) -> str:
-    horizontal: list[int] = find_horizontal_lines(matrix)
-    vertical: list[int] = find_vertical_lines(matrix)
-
+def classify_lines(
+    horizontal: list[int], vertical: list[int], width: int, height: int
+) -> str:
     if is_square(horizontal, vertical):
         return "Square"
-    if is_line(horizontal, vertical, len(matrix[0])):
+    if is_line(horizontal, vertical, width):
         return "Line"
-    if is_vertical_line(horizontal, vertical, len(matrix)):
+    if is_vertical_line(horizontal, vertical, height):
         return "Vertical line"
     return "?"
 
 
+def define_type(matrix: list[list[str]]) -> str:
+    horizontal: list[int] = find_horizontal_lines(matrix)
+    vertical: list[int] = find_vertical_lines(matrix)
+    return classify_lines(horizontal, vertical, len(matrix[0]), len(matrix))
+
+
+class ShapeClassifier:
+    def __init__(self) -> None:
+        self.__height: int = 0
+        self.__width: int = 0
+        self.__full: int = 0
+        self.__horizontal: list[int] = []
+        self.__columns: int = 0
+
+    def push(self, string: list[str]) -> None:
+        packed: int = pack_string(string)
+        if not self.__height:
+            self.__width = len(string)
+            self.__full = (1 << self.__width) - 1
+            self.__columns = self.__full
+        if packed == self.__full:
+            self.__horizontal.append(self.__height)
+        self.__columns &= packed
+        self.__height += 1
+
+    def extend(self, strings: Iterable[list[str]]) -> "ShapeClassifier":
+        string: list[str]
+        for string in strings:
+            self.push(string)
+        return self
+
+    def get_shape(self) -> tuple[int, int]:
+        return (self.__height, self.__width)
+
+    def find_horizontal_lines(self) -> list[int]:
+        return self.__horizontal
+
+    def find_vertical_lines(self) -> list[int]:
+        return [
+            j
+            for j in range(self.__width)
+            if self.__columns >> (self.__width - 1 - j) & 1
+        ]
+
+    def classify(self) -> str:
+        return classify_lines(
+            self.__horizontal, self.find_vertical_lines(), self.__width, self.__height
+        )
+
+
+def check_binary_strings(strings: Iterable[list[str]]) -> Iterator[list[str]]:
+    string: list[str]
+    for string in strings:
+        if not all(cell in "01" for cell in string):
+            raise TypeError
+        yield string
+
+
+def iter_binary_data(path: str) -> Iterator[list[str]]:
+    with BinaryMatrix.open(path) as binary:
+        yield from check_binary_strings(binary.iter_str_strings())
+
+
+def read_binary_data(path: str) -> list[list[str]]:
+    return list(iter_binary_data(path))
+
+
+def classify_image(data: bytes) -> str:
+    strings: Iterator[list[str]]
+    if data.startswith(MATRIX_MAGIC):
+        strings = check_binary_strings(BinaryMatrix(data).iter_str_strings())
+    else:
+        reader: BulkReader = BulkReader(BytesIO(data))
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = reader.read_amounts()
+        strings = reader.iter_str_matrix(
+            amount_of_strings, amount_of_rows, BINARY_PATTERN
+        )
+    return ShapeClassifier().extend(strings).classify()
+
+
+def try_classify_image(data: bytes) -> str:
+    try:
+        return classify_image(data)
+    except (EOFError, StructError, TypeError, ValueError):
+        return ERROR_TYPE
+
+
+def get_image_key(data: bytes) -> bytes:
+    return blake2b(data, digest_size=16).digest()
+
+
+def iter_stream_images(reader: BulkReader) -> Iterator[bytes]:
+    while True:
+        try:
+            header: bytes = reader.read_raw_line()
+        except EOFError:
+            return
+        amounts: list[bytes] = header.split()
+        if not amounts:
+            continue
+        if len(amounts) != 2 or not amounts[0].isdigit():
+            yield header
+            continue
+
+        lines: list[bytes] = [header]
+        try:
+            for _ in range(int(amounts[0])):
+                lines.append(reader.read_raw_line())
+        except EOFError:
+            yield b"\n".join(lines)
+            return
+        yield b"\n".join(lines)
+
+
+def iter_directory_images(directory: str) -> Iterator[tuple[str, bytes]]:
+    name: str
+    for name in sorted(listdir(directory)):
+        path: str = join(directory, name)
+        if isfile(path):
+            with open(path, "rb") as file:
+                yield name, file.read()
+
+
+class ResultCache:
+    def __init__(self, size: int = CACHE_SIZE, path: str | None = None) -> None:
+        self.__size: int = size
+        self.__memory: OrderedDict[bytes, str] = OrderedDict()
+        self.__database = open_database(path, "c") if path is not None else None
+
+    def get(self, key: bytes) -> str | None:
+        if key in self.__memory:
+            self.__memory.move_to_end(key)
+            return self.__memory[key]
+        if self.__database is not None and key in self.__database:
+            value: str = self.__database[key].decode()
+            self.__remember(key, value)
+            return value
+        return None
+
+    def __remember(self, key: bytes, value: str) -> None:
+        self.__memory[key] = value
+        if len(self.__memory) > self.__size:
+            self.__memory.popitem(last=False)
+
+    def put(self, key: bytes, value: str) -> None:
+        self.__remember(key, value)
+        if self.__database is not None:
+            self.__database[key] = value.encode()
+
+    def close(self) -> None:
+        if self.__database is not None:
+            self.__database.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+def classify_batch(
+    images: Iterable[tuple[T, bytes]],
+    cache: ResultCache,
+    executor: Executor | None = None,
+    batch_size: int = BATCH_SIZE,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[tuple[T, str]]:
+    iterator: Iterator[tuple[T, bytes]] = iter(images)
+    while batch := list(islice(iterator, batch_size)):
+        keys: list[bytes] = [get_image_key(image) for _, image in batch]
+        answers: dict[bytes, str] = {}
+        missing: dict[bytes, bytes] = {}
+
+        key: bytes
+        image: bytes
+        for key, (_, image) in zip(keys, batch):
+            if key in answers or key in missing:
+                continue
+            cached: str | None = cache.get(key)
+            if cached is None:
+                missing[key] = image
+            else:
+                answers[key] = cached
+
+        results: Iterable[str] = (
+            executor.map(try_classify_image, missing.values(), chunksize=chunk_size)
+            if executor is not None
+            else map(try_classify_image, missing.values())
+        )
+        result: str
+        for key, result in zip(missing, results):
+            answers[key] = result
+            cache.put(key, result)
+
+        name: T
+        for key, (name, _) in zip(keys, batch):
+            yield name, answers[key]
+
+
+def parse_arguments(arguments: list[str] | None = None) -> Namespace:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--batch", action="store_true")
+    parser.add_argument("--directory", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default=None)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    return parser.parse_args(arguments)
+
+
 def main() -> None:
-    amount_of_strings: int
-    amount_of_rows: int
-    amount_of_strings, amount_of_rows = read_amounts()
-    matrix: list[list[int]] = read_data(amount_of_strings, amount_of_rows)
+    arguments: Namespace = parse_arguments()
+
+    if arguments.batch or arguments.directory is not None:
+        images: Iterable[tuple[object, bytes]] = (
+            iter_directory_images(arguments.directory)
+            if arguments.directory is not None
+            else enumerate(iter_stream_images(BulkReader()))
+        )
+        with (
+            ResultCache(arguments.cache_size, arguments.cache) as cache,
+            ProcessPoolExecutor(max_workers=arguments.workers) as executor,
+        ):
+            name: object
+            answer: str
+            for name, answer in classify_batch(images, cache, executor):
+                print(f"{name} {answer}" if arguments.directory is not None else answer)
+        return
+
+    strings: Iterator[list[str]]
+    if arguments.path is not None:
+        strings = iter_binary_data(arguments.path)
+    else:
+        reader: BulkReader = BulkReader()
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = reader.read_amounts()
+        strings = reader.iter_str_matrix(
+            amount_of_strings, amount_of_rows, BINARY_PATTERN
+        )
 
-    print(define_type(matrix))
+    print(ShapeClassifier().extend(strings).classify())
 
 
 if __name__ == "__main__":
@@ -152,6 +415,26 @@ class TestInputData(TestCase):
         mock_input.assert_called()
 
 
+class TestBinaryInput(TestCase):
+    def setUp(self) -> None:
+        self.__directory: TemporaryDirectory = TemporaryDirectory()
+        self.__path: str = f"{self.__directory.name}/image.bin"
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_correct(self) -> None:
+        with open(self.__path, "wb") as file:
+            BinaryMatrix.write(file, [["0", "1"], ["1", "1"]])
+        self.assertEqual(read_binary_data(self.__path), [["0", "1"], ["1", "1"]])
+
+    def test_incorrect_types(self) -> None:
+        with open(self.__path, "wb") as file:
+            BinaryMatrix.write(file, [["0", "2"]])
+        with self.assertRaises(TypeError):
+            read_binary_data(self.__path)
+
+
 class TestMatrix(TestCase):
     def setUp(self) -> None:
         self.__matrix: list[list[str]] = [["0"] * 5, ["1"] * 5, ["0"] * 5, ["1"] * 5]
@@ -191,3 +474,113 @@ class TestMatrix(TestCase):
         self.assertFalse(
             is_vertical_line(self.__horizontal, self.__vertical, len(self.__matrix))
         )
+
+
+class TestShapeClassifier(TestCase):
+    def setUp(self) -> None:
+        self.__matrices: list[list[list[str]]] = [
+            [["0"] * 5, ["1"] * 5, ["0"] * 5, ["1"] * 5],
+            [list("10101"), list("10101"), list("10101")],
+            [list("111"), list("101"), list("111")],
+            [list("1001"), list("0110")],
+        ]
+
+    def test_pack_string(self) -> None:
+        self.assertEqual(pack_string(list("1011")), 0b1011)
+        self.assertEqual(pack_string(["1", "01", "0"]), 0b110)
+
+    def test_lines_match_matrix(self) -> None:
+        matrix: list[list[str]]
+        for matrix in self.__matrices:
+            classifier: ShapeClassifier = ShapeClassifier().extend(iter(matrix))
+            self.assertEqual(classifier.get_shape(), (len(matrix), len(matrix[0])))
+            self.assertEqual(
+                classifier.find_horizontal_lines(), find_horizontal_lines(matrix)
+            )
+            self.assertEqual(
+                classifier.find_vertical_lines(), find_vertical_lines(matrix)
+            )
+            self.assertEqual(classifier.classify(), define_type(matrix))
+
+
+class TestBatchClassification(TestCase):
+    def setUp(self) -> None:
+        self.__directory: TemporaryDirectory = TemporaryDirectory()
+        self.__stream: bytes = (
+            b"4 3\n0 0 0\n1 1 1\n0 0 0\n1 1 1\n"
+            b"3 3\n1 1 1\n1 0 1\n1 1 1\n"
+            b"4 3\n0 0 0\n1 1 1\n0 0 0\n1 1 1\n"
+            b"2 2\n1 2\n1 1\n\n"
+        )
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_iter_stream_images(self) -> None:
+        self.assertEqual(
+            list(iter_stream_images(BulkReader(BytesIO(self.__stream)))),
+            [
+                b"4 3\n0 0 0\n1 1 1\n0 0 0\n1 1 1",
+                b"3 3\n1 1 1\n1 0 1\n1 1 1",
+                b"4 3\n0 0 0\n1 1 1\n0 0 0\n1 1 1",
+                b"2 2\n1 2\n1 1",
+            ],
+        )
+
+    def test_iter_truncated_stream_images(self) -> None:
+        self.assertEqual(
+            list(iter_stream_images(BulkReader(BytesIO(b"2 2\n1 1\nx y\n1 1\n")))),
+            [b"2 2\n1 1\nx y", b"1 1"],
+        )
+
+    def test_iter_images_after_bad_header(self) -> None:
+        stream: bytes = b"1 2\n1 1\nbad header\n3 3\n1 1 1\n1 0 1\n1 1 1\n"
+        images: Iterator[bytes] = iter_stream_images(BulkReader(BytesIO(stream)))
+        self.assertEqual(
+            list(classify_batch(enumerate(images), ResultCache())),
+            [(0, "?"), (1, ERROR_TYPE), (2, "Square")],
+        )
+
+    def test_classify_batch(self) -> None:
+        cache: ResultCache = ResultCache(1)
+        images: Iterator[bytes] = iter_stream_images(BulkReader(BytesIO(self.__stream)))
+        with patch(
+            f"{__name__}.try_classify_image", side_effect=try_classify_image
+        ) as mock:
+            self.assertEqual(
+                list(classify_batch(enumerate(images), cache, batch_size=4)),
+                [(0, "Line"), (1, "Square"), (2, "Line"), (3, ERROR_TYPE)],
+            )
+            self.assertEqual(mock.call_count, 3)
+
+    def test_disk_cache(self) -> None:
+        path: str = join(self.__directory.name, "cache")
+        with ResultCache(path=path) as cache:
+            cache.put(b"key", "Square")
+        with ResultCache(path=path) as cache:
+            self.assertEqual(cache.get(b"key"), "Square")
+            self.assertIsNone(cache.get(b"missing"))
+
+    def test_directory_with_pool(self) -> None:
+        with open(join(self.__directory.name, "a.txt"), "wb") as file:
+            file.write(b"2 2\n1 1\n0 1\n")
+        with open(join(self.__directory.name, "b.bin"), "wb") as file:
+            BinaryMatrix.write(file, [list("101"), list("101")])
+        with open(join(self.__directory.name, "c.bin"), "wb") as file:
+            file.write(MATRIX_MAGIC + b"q")
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            self.assertEqual(
+                list(
+                    classify_batch(
+                        iter_directory_images(self.__directory.name),
+                        ResultCache(),
+                        executor,
+                    )
+                ),
+                [
+                    ("a.txt", "Square"),
+                    ("b.bin", "Vertical line"),
+                    ("c.bin", ERROR_TYPE),
+                ],
+            )
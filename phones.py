@@ -1,4 +1,15 @@
+from argparse import ArgumentParser, Namespace
+from collections.abc import Container, Iterable, Iterator
+from io import StringIO
+from mmap import ACCESS_READ, mmap
+from sys import stdin
+from tempfile import TemporaryDirectory
+from typing import BinaryIO, TextIO
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+SIMPLIFY_TABLE: dict[int, None] = str.maketrans("", "", "-()+")
+RECORD_SIZE: int = 10
 
 
 class Descriptor:
@@ -16,12 +27,10 @@ class Descriptor:
 
     @staticmethod
     def simplify(string: str) -> str:
-        return Descriptor.remove_plus(
-            Descriptor.remove_branches(Descriptor.remove_lines(string))
-        )
+        return string.translate(SIMPLIFY_TABLE)
 
     @staticmethod
-    def divide(string: str, default_code: str = "495") -> list[str]:
+    def try_divide(string: str, default_code: str = "495") -> list[str] | None:
         if len(string) == 11:
             return [string[1:4], string[4:]]
         elif len(string) == 10:
@@ -29,7 +38,24 @@ class Descriptor:
         elif len(string) == 7:
             return [default_code, string]
         else:
+            return None
+
+    @staticmethod
+    def divide(string: str, default_code: str = "495") -> list[str]:
+        parts: list[str] | None = Descriptor.try_divide(string, default_code)
+        if parts is None:
             raise TypeError
+        return parts
+
+    @staticmethod
+    def normalize_all(
+        raw_numbers: Iterable[str], default_code: str = "495"
+    ) -> Iterator[tuple[str, list[str] | None]]:
+        raw_number: str
+        for raw_number in raw_numbers:
+            yield raw_number, Descriptor.try_divide(
+                raw_number.translate(SIMPLIFY_TABLE), default_code
+            )
 
 
 class PhoneNumber:
@@ -37,30 +63,266 @@ class PhoneNumber:
         self.code: str = code
         self.number: str = number
 
-    def __eq__(self, value: "PhoneNumber") -> bool:
+    @staticmethod
+    def parse(raw_number: str) -> "PhoneNumber":
+        return PhoneNumber(*Descriptor.divide(Descriptor.simplify(raw_number)))
+
+    def get_key(self) -> tuple[str, str]:
+        return (self.code, self.number)
+
+    def __eq__(self, value: object) -> bool:
+        if not isinstance(value, PhoneNumber):
+            return NotImplemented
         return self.code == value.code and self.number == value.number
 
+    def __hash__(self) -> int:
+        return hash(self.get_key())
+
+
+class PhoneIndex:
+    def __init__(self, raw_numbers: Iterable[str] = ()) -> None:
+        self.__keys: set[tuple[str, str]] = set()
+        self.extend(raw_numbers)
+
+    def add(self, number: PhoneNumber) -> None:
+        self.__keys.add(number.get_key())
+
+    def extend(self, raw_numbers: Iterable[str]) -> None:
+        self.__keys.update(
+            (parts[0], parts[1])
+            for _, parts in Descriptor.normalize_all(raw_numbers)
+            if parts is not None
+        )
+
+    def __contains__(self, number: PhoneNumber) -> bool:
+        return number.get_key() in self.__keys
+
+    def __len__(self) -> int:
+        return len(self.__keys)
+
+
+def is_near(first: str, second: str) -> bool:
+    if first == second:
+        return True
+    if len(first) > len(second):
+        first, second = second, first
+    if len(second) - len(first) > 1:
+        return False
+
+    index: int = 0
+    while index < len(first) and first[index] == second[index]:
+        index += 1
+
+    if len(first) < len(second):
+        return first[index:] == second[index + 1 :]
+    return first[index + 1 :] == second[index + 1 :] or (
+        first[index + 2 :] == second[index + 2 :]
+        and first[index] == second[index + 1]
+        and first[index + 1] == second[index]
+    )
+
+
+class NearPhoneIndex:
+    def __init__(self, raw_numbers: Iterable[str] = ()) -> None:
+        self.__variants: dict[str, set[tuple[str, str]]] = {}
+        self.extend(raw_numbers)
+
+    @staticmethod
+    def __iter_variants(string: str) -> Iterator[str]:
+        yield string
+        index: int
+        for index in range(len(string)):
+            yield string[:index] + string[index + 1 :]
+
+    def add(self, number: PhoneNumber) -> None:
+        key: tuple[str, str] = number.get_key()
+        variant: str
+        for variant in NearPhoneIndex.__iter_variants("".join(key)):
+            self.__variants.setdefault(variant, set()).add(key)
+
+    def extend(self, raw_numbers: Iterable[str]) -> None:
+        parts: list[str] | None
+        for _, parts in Descriptor.normalize_all(raw_numbers):
+            if parts is not None:
+                self.add(PhoneNumber(*parts))
+
+    def find(self, number: PhoneNumber) -> list[PhoneNumber]:
+        string: str = "".join(number.get_key())
+        candidates: set[tuple[str, str]] = set()
+        variant: str
+        for variant in NearPhoneIndex.__iter_variants(string):
+            candidates.update(self.__variants.get(variant, ()))
+
+        return [
+            PhoneNumber(*key)
+            for key in sorted(candidates)
+            if is_near(string, "".join(key))
+        ]
+
+    def find_all(
+        self, raw_numbers: Iterable[str]
+    ) -> Iterator[tuple[str, list[PhoneNumber] | None]]:
+        raw_number: str
+        parts: list[str] | None
+        for raw_number, parts in Descriptor.normalize_all(raw_numbers):
+            yield raw_number, None if parts is None else self.find(PhoneNumber(*parts))
+
+
+class PhoneFileIndex:
+    def __init__(self, path: str) -> None:
+        self.__file: BinaryIO = open(path, "rb")
+        self.__data: mmap | bytes = b""
+        if self.__file.seek(0, 2):
+            self.__data = mmap(self.__file.fileno(), 0, access=ACCESS_READ)
+        self.__size: int = len(self.__data) // RECORD_SIZE
+
+    @staticmethod
+    def encode(parts: Iterable[str]) -> bytes | None:
+        record: bytes = "".join(parts).encode("ascii", "replace")
+        return record if len(record) == RECORD_SIZE and record.isdigit() else None
+
+    @staticmethod
+    def build(path: str, raw_numbers: Iterable[str], default_code: str = "495") -> int:
+        records: set[bytes] = {
+            record
+            for _, parts in Descriptor.normalize_all(raw_numbers, default_code)
+            if parts is not None
+            and (record := PhoneFileIndex.encode(parts)) is not None
+        }
+        with open(path, "wb") as file:
+            file.write(b"".join(sorted(records)))
+        return len(records)
+
+    def __contains__(self, number: PhoneNumber) -> bool:
+        record: bytes | None = PhoneFileIndex.encode(number.get_key())
+        if record is None:
+            return False
+
+        low: int = 0
+        high: int = self.__size
+        while low < high:
+            middle: int = (low + high) // 2
+            offset: int = middle * RECORD_SIZE
+            current: bytes = self.__data[offset : offset + RECORD_SIZE]
+            if current == record:
+                return True
+            if current < record:
+                low = middle + 1
+            else:
+                high = middle
+        return False
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def close(self) -> None:
+        if isinstance(self.__data, mmap):
+            self.__data.close()
+        self.__file.close()
+
+    def __enter__(self) -> "PhoneFileIndex":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+
+def iter_raw_numbers(stream: TextIO) -> Iterator[str]:
+    line: str
+    for line in stream:
+        raw_number: str = line.strip()
+        if raw_number:
+            yield raw_number
+
+
+def check_numbers(
+    index: Container[PhoneNumber], raw_numbers: Iterable[str]
+) -> Iterator[bool]:
+    parts: list[str] | None
+    for _, parts in Descriptor.normalize_all(raw_numbers):
+        yield parts is not None and PhoneNumber(*parts) in index
+
+
+def parse_arguments(arguments: list[str] | None = None) -> Namespace:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("--index", default=None)
+    parser.add_argument("--build", action="store_true")
+    parser.add_argument("--numbers", default=None)
+    parser.add_argument("--near", action="store_true")
+    namespace: Namespace = parser.parse_args(arguments)
+    if namespace.build and namespace.index is None:
+        parser.error("--build requires --index")
+    if namespace.near and namespace.numbers is None:
+        parser.error("--near requires --numbers")
+    if namespace.numbers is not None and namespace.index is not None:
+        parser.error("--numbers cannot be combined with --index")
+    return namespace
+
 
 def main() -> None:
+    arguments: Namespace = parse_arguments()
+
+    if arguments.build:
+        print(PhoneFileIndex.build(arguments.index, iter_raw_numbers(stdin)))
+        return
+
+    if arguments.numbers is not None:
+        with open(arguments.numbers) as file:
+            known_numbers: list[str] = list(iter_raw_numbers(file))
+
+        if arguments.near:
+            near_index: NearPhoneIndex = NearPhoneIndex(known_numbers)
+            numbers: list[PhoneNumber] | None
+            for _, numbers in near_index.find_all(iter_raw_numbers(stdin)):
+                print(
+                    " ".join("".join(number.get_key()) for number in numbers)
+                    if numbers
+                    else "NO"
+                )
+            return
+
+        found: bool
+        for found in check_numbers(PhoneIndex(known_numbers), iter_raw_numbers(stdin)):
+            print("YES" if found else "NO")
+        return
+
+    if arguments.index is not None:
+        with PhoneFileIndex(arguments.index) as file_index:
+            for found in check_numbers(file_index, iter_raw_numbers(stdin)):
+                print("YES" if found else "NO")
+        return
+
     new_raw_number: str = input()
     current_raw_numbers: list[str] = [input() for _ in range(3)]
 
-    new_number: PhoneNumber = PhoneNumber(
-        *Descriptor.divide(Descriptor.simplify(new_raw_number))
-    )
+    new_number: PhoneNumber = PhoneNumber.parse(new_raw_number)
     current_numbers: list[PhoneNumber] = list(
-        map(
-            lambda raw_number: PhoneNumber(
-                *Descriptor.divide(Descriptor.simplify(raw_number))
-            ),
-            current_raw_numbers,
-        )
+        map(PhoneNumber.parse, current_raw_numbers)
     )
 
     for number in current_numbers:
         print("YES" if number == new_number else "NO")
 
 
+class TestDescriptor(TestCase):
+    def test_simplify(self) -> None:
+        self.assertEqual(Descriptor.simplify("+7(917)123-45-67"), "79171234567")
+
+    def test_divide_incorrect(self) -> None:
+        with self.assertRaises(TypeError):
+            Descriptor.divide("12345")
+
+    def test_normalize_all(self) -> None:
+        self.assertEqual(
+            list(Descriptor.normalize_all(["+7(917)123-45-67", "12-34", "123-45-67"])),
+            [
+                ("+7(917)123-45-67", ["917", "1234567"]),
+                ("12-34", None),
+                ("123-45-67", ["495", "1234567"]),
+            ],
+        )
+
+
 class TestPhoneNumber(TestCase):
     def setUp(self):
         self.__test_code: str = "917"
@@ -77,6 +339,144 @@ class TestPhoneNumber(TestCase):
         another_test_phone_number: PhoneNumber = PhoneNumber("123", "1231231")
         self.assertFalse(self.__test_phone_number == another_test_phone_number)
 
+    def test_hash(self) -> None:
+        self.assertEqual(
+            hash(self.__test_phone_number), hash(PhoneNumber("917", "1234567"))
+        )
+        self.assertEqual(
+            len({self.__test_phone_number, PhoneNumber("917", "1234567")}), 1
+        )
+
+    def test_parse(self) -> None:
+        self.assertEqual(PhoneNumber.parse("8(917)123-45-67"), self.__test_phone_number)
+
+
+class TestPhoneIndex(TestCase):
+    def setUp(self) -> None:
+        self.__index: PhoneIndex = PhoneIndex(
+            ["+7-917-123-45-67", "8(917)1234567", "12-34", "123-45-67"]
+        )
+
+    def test_len(self) -> None:
+        self.assertEqual(len(self.__index), 2)
+
+    def test_contains(self) -> None:
+        self.assertIn(PhoneNumber("917", "1234567"), self.__index)
+        self.assertIn(PhoneNumber("495", "1234567"), self.__index)
+        self.assertNotIn(PhoneNumber("916", "1234567"), self.__index)
+
+    def test_check(self) -> None:
+        self.assertEqual(
+            list(
+                check_numbers(
+                    self.__index, ["89171234567", "4951234567", "9161234567", "1-2"]
+                )
+            ),
+            [True, True, False, False],
+        )
+
+
+class TestNearPhoneIndex(TestCase):
+    def setUp(self) -> None:
+        self.__index: NearPhoneIndex = NearPhoneIndex(
+            ["+7(917)123-45-67", "916-765-43-21", "12-34"]
+        )
+
+    def test_is_near(self) -> None:
+        self.assertTrue(is_near("1234567", "1234567"))
+        self.assertTrue(is_near("1234567", "1234597"))
+        self.assertTrue(is_near("1234567", "1243567"))
+        self.assertTrue(is_near("1234567", "123567"))
+        self.assertTrue(is_near("1234567", "12345678"))
+        self.assertTrue(is_near("", "1"))
+        self.assertFalse(is_near("1234567", "2134576"))
+        self.assertFalse(is_near("1234567", "12345"))
+
+    def test_find(self) -> None:
+        self.assertEqual(
+            self.__index.find(PhoneNumber("917", "1243567")),
+            [PhoneNumber("917", "1234567")],
+        )
+        self.assertEqual(self.__index.find(PhoneNumber("917", "7654320")), [])
+
+    def test_find_all(self) -> None:
+        self.assertEqual(
+            list(self.__index.find_all(["89161765432", "9167654320", "1-2"])),
+            [
+                ("89161765432", []),
+                ("9167654320", [PhoneNumber("916", "7654321")]),
+                ("1-2", None),
+            ],
+        )
+
+
+class TestPhoneFileIndex(TestCase):
+    def setUp(self) -> None:
+        self.__directory: TemporaryDirectory = TemporaryDirectory()
+        self.__path: str = f"{self.__directory.name}/phones.idx"
+        self.__amount: int = PhoneFileIndex.build(
+            self.__path,
+            ["+7(917)123-45-67", "8-917-1234567", "123-45-67", "12-34", "916-1112233"],
+        )
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_build(self) -> None:
+        self.assertEqual(self.__amount, 3)
+        with open(self.__path, "rb") as file:
+            self.assertEqual(file.read(), b"495123456791611122339171234567")
+
+    def test_contains(self) -> None:
+        with PhoneFileIndex(self.__path) as index:
+            self.assertEqual(len(index), 3)
+            self.assertIn(PhoneNumber("917", "1234567"), index)
+            self.assertIn(PhoneNumber("495", "1234567"), index)
+            self.assertIn(PhoneNumber("916", "1112233"), index)
+            self.assertNotIn(PhoneNumber("916", "1234567"), index)
+            self.assertNotIn(PhoneNumber("9", "12"), index)
+
+    def test_empty(self) -> None:
+        path: str = f"{self.__directory.name}/empty.idx"
+        PhoneFileIndex.build(path, [])
+        with PhoneFileIndex(path) as index:
+            self.assertNotIn(PhoneNumber("917", "1234567"), index)
+
+    def test_check_numbers(self) -> None:
+        with PhoneFileIndex(self.__path) as index:
+            self.assertEqual(
+                list(check_numbers(index, ["8(917)123-45-67", "12-34", "9161234567"])),
+                [True, False, False],
+            )
+
+    @patch("builtins.print")
+    def test_main_with_index(self, mock_print: MagicMock) -> None:
+        arguments: Namespace = parse_arguments(["--index", self.__path])
+        with patch(f"{__name__}.stdin", StringIO("89171234567\n\n12-34\n1112233\n")):
+            with patch(f"{__name__}.parse_arguments", return_value=arguments):
+                main()
+        self.assertEqual(
+            [call.args for call in mock_print.call_args_list],
+            [("YES",), ("NO",), ("NO",)],
+        )
+
+    @patch("builtins.print")
+    def test_main_with_numbers(self, mock_print: MagicMock) -> None:
+        path: str = f"{self.__directory.name}/known.txt"
+        with open(path, "w") as file:
+            file.write("+7(917)123-45-67\n12-34\n")
+        arguments: Namespace = parse_arguments(["--numbers", path])
+        with patch(f"{__name__}.stdin", StringIO("89171234567\n12-34\n")):
+            with patch(f"{__name__}.parse_arguments", return_value=arguments):
+                main()
+        self.assertEqual(
+            [call.args for call in mock_print.call_args_list], [("YES",), ("NO",)]
+        )
+
+    def test_numbers_with_index(self) -> None:
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            parse_arguments(["--numbers", "known.txt", "--index", self.__path])
+
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,27 @@
+from argparse import ArgumentParser, Namespace
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import Callable, Iterable
+from itertools import accumulate
+from mmap import ACCESS_READ, mmap
+from operator import add
+from os import listdir, remove, replace, stat, stat_result, utime
+from os.path import abspath, dirname, exists
+from struct import Struct
+from struct import error as StructError
+from sys import byteorder
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+from typing import BinaryIO
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+from matrix_core import BinaryMatrix, BulkReader, slice_matrix
+
+TILE_MAGIC: bytes = b"TIDX"
+TILE_HEADER: Struct = Struct("<4sc3xQQQQQ")
+TILE_SIZE: int = 255
+
 
 def read_amounts() -> tuple[int, int]:
     raw_string: list[str] = input().split()
@@ -13,7 +34,11 @@ def read_amounts() -> tuple[int, int]:
 
 
 def read_boarders() -> tuple[int, int, int, int]:
-    raw_string: list[str] = input().split()
+    return parse_boarders(input())
+
+
+def parse_boarders(line: str) -> tuple[int, int, int, int]:
+    raw_string: list[str] = line.split()
     if len(raw_string) != 4:
         raise ValueError
     elif not all(substring.isdigit() for substring in raw_string):
@@ -22,6 +47,26 @@ def read_boarders() -> tuple[int, int, int, int]:
         return tuple(map(lambda num: int(num) - 1, raw_string))
 
 
+def parse_symbol_query(line: str) -> tuple[tuple[int, int, int, int], list[str]]:
+    raw_string: list[str] = line.split()
+    return parse_boarders(" ".join(raw_string[:4])), raw_string[4:]
+
+
+def parse_update(raw_string: list[str]) -> tuple[int, int, str]:
+    if len(raw_string) != 3:
+        raise ValueError
+    elif not (raw_string[0].isdigit() and raw_string[1].isdigit()):
+        raise TypeError
+    return int(raw_string[0]) - 1, int(raw_string[1]) - 1, raw_string[2]
+
+
+def parse_length(line: str) -> int:
+    raw_num: str = line.strip()
+    if not raw_num.isdigit():
+        raise TypeError
+    return int(raw_num)
+
+
 def read_data(amount_of_strings: int, amount_of_rows: int) -> list[list[str]]:
     matrix: list[list[str]] = [[]] * amount_of_strings
 
@@ -35,37 +80,490 @@ def read_data(amount_of_strings: int, amount_of_rows: int) -> list[list[str]]:
     return matrix
 
 
-def slice_matrix(
-    matrix: list[list[str]],
-    row_start: int,
-    column_start: int,
-    row_end: int,
-    column_end: int,
-) -> list[list[str]]:
-    if (
-        row_start >= len(matrix)
-        or row_end >= len(matrix)
-        or column_start >= len(matrix[0])
-        or column_end >= len(matrix[0])
-    ):
-        raise IndexError
-    return [
-        matrix[i][column_start : column_end + 1] for i in range(row_start, row_end + 1)
-    ]
+def find_security_in_matrix(matrix: list[list[str]]) -> int:
+    return sum("".join(row).count("S") for row in matrix)
+
+
+class SecurityIndex:
+    def __init__(self, matrix: list[list[str]], symbol: str = "S") -> None:
+        self.__amount_of_strings: int = len(matrix)
+        self.__width: int = (len(matrix[0]) if matrix else 0) + 1
+        self.__sums: array = array("q", [0]) * self.__width
+
+        string: list[str]
+        for string in matrix:
+            above: array = self.__sums[len(self.__sums) - self.__width + 1 :]
+            self.__sums.append(0)
+            self.__sums.extend(
+                map(add, above, accumulate(cell.count(symbol) for cell in string))
+            )
+
+    def __get_sum(self, string_index: int, row_index: int) -> int:
+        return self.__sums[string_index * self.__width + row_index]
+
+    def count(
+        self, row_start: int, column_start: int, row_end: int, column_end: int
+    ) -> int:
+        if (
+            min(row_start, column_start, row_end, column_end) < 0
+            or row_end >= self.__amount_of_strings
+            or row_start >= self.__amount_of_strings
+            or column_start >= self.__width - 1
+            or column_end >= self.__width - 1
+        ):
+            raise IndexError
+        if row_start > row_end or column_start > column_end:
+            return 0
+        return (
+            self.__get_sum(row_end + 1, column_end + 1)
+            - self.__get_sum(row_start, column_end + 1)
+            - self.__get_sum(row_end + 1, column_start)
+            + self.__get_sum(row_start, column_start)
+        )
 
 
-def find_security_in_matrix(matrix: list[list[str]]) -> int:
-    return "".join("".join(row) for row in matrix).count("S")
+class SparseSymbolIndex:
+    def __init__(self) -> None:
+        self.__strings: list[int] = []
+        self.__columns: list[array] = []
+
+    def add(self, string_index: int, row_index: int) -> None:
+        if not self.__strings or self.__strings[-1] != string_index:
+            self.__strings.append(string_index)
+            self.__columns.append(array("q"))
+        self.__columns[-1].append(row_index)
+
+    def count(
+        self, row_start: int, column_start: int, row_end: int, column_end: int
+    ) -> int:
+        answer: int = 0
+        position: int
+        for position in range(
+            bisect_left(self.__strings, row_start),
+            bisect_right(self.__strings, row_end),
+        ):
+            columns: array = self.__columns[position]
+            answer += bisect_right(columns, column_end) - bisect_left(
+                columns, column_start
+            )
+        return answer
+
+
+class RegionIndex:
+    def __init__(self, matrix: list[list[str]], frequent_share: float = 1 / 16) -> None:
+        self.__shape: tuple[int, int] = (len(matrix), len(matrix[0]) if matrix else 0)
+        amounts: Counter[str] = Counter()
+        string: list[str]
+        for string in matrix:
+            amounts.update("".join(string))
+
+        cells: int = self.__shape[0] * self.__shape[1]
+        sparse: dict[str, SparseSymbolIndex] = {
+            symbol: SparseSymbolIndex()
+            for symbol, amount in amounts.items()
+            if amount < cells * frequent_share
+        }
+        self.__indexes: dict[str, SecurityIndex | SparseSymbolIndex] = {
+            symbol: SecurityIndex(matrix, symbol)
+            for symbol in amounts
+            if symbol not in sparse
+        }
+        self.__indexes.update(sparse)
+
+        string_index: int
+        for string_index, string in enumerate(matrix):
+            row_index: int
+            cell: str
+            for row_index, cell in enumerate(string):
+                symbol: str
+                for symbol in cell:
+                    if symbol in sparse:
+                        sparse[symbol].add(string_index, row_index)
+
+    def count(
+        self,
+        symbols: Iterable[str],
+        row_start: int,
+        column_start: int,
+        row_end: int,
+        column_end: int,
+    ) -> list[int]:
+        if (
+            min(row_start, column_start, row_end, column_end) < 0
+            or max(row_start, row_end) >= self.__shape[0]
+            or max(column_start, column_end) >= self.__shape[1]
+        ):
+            raise IndexError
+        return [
+            self.__indexes[symbol].count(row_start, column_start, row_end, column_end)
+            if symbol in self.__indexes
+            else 0
+            for symbol in symbols
+        ]
 
 
-def main() -> None:
-    amount_of_strings: int
-    amount_of_rows: int
-    amount_of_strings, amount_of_rows = read_amounts()
+class SecurityGrid:
+    def __init__(self, matrix: list[list[str]], symbol: str = "S") -> None:
+        self.__matrix: list[list[str]] = matrix
+        self.__symbol: str = symbol
+        self.__amount_of_strings: int = len(matrix)
+        self.__amount_of_rows: int = len(matrix[0]) if matrix else 0
+        self.__width: int = self.__amount_of_rows + 1
+        self.__tree: array = array("q", [0]) * (
+            (self.__amount_of_strings + 1) * self.__width
+        )
+
+        string_index: int
+        string: list[str]
+        for string_index, string in enumerate(matrix, 1):
+            start: int = string_index * self.__width
+            row_index: int
+            cell: str
+            for row_index, cell in enumerate(string, 1):
+                self.__tree[start + row_index] += cell.count(symbol)
+                parent: int = row_index + (row_index & -row_index)
+                if parent <= self.__amount_of_rows:
+                    self.__tree[start + parent] += self.__tree[start + row_index]
+
+        for string_index in range(1, self.__amount_of_strings + 1):
+            parent: int = string_index + (string_index & -string_index)
+            if parent <= self.__amount_of_strings:
+                source: int = string_index * self.__width
+                target: int = parent * self.__width
+                self.__tree[target : target + self.__width] = array(
+                    "q",
+                    map(
+                        add,
+                        self.__tree[target : target + self.__width],
+                        self.__tree[source : source + self.__width],
+                    ),
+                )
+
+    def __check(self, string_index: int, row_index: int) -> None:
+        if not (
+            0 <= string_index < self.__amount_of_strings
+            and 0 <= row_index < self.__amount_of_rows
+        ):
+            raise IndexError
+
+    def __add(self, string_index: int, row_index: int, delta: int) -> None:
+        i: int = string_index + 1
+        while i <= self.__amount_of_strings:
+            j: int = row_index + 1
+            while j <= self.__amount_of_rows:
+                self.__tree[i * self.__width + j] += delta
+                j += j & -j
+            i += i & -i
+
+    def __prefix(self, string_end: int, row_end: int) -> int:
+        answer: int = 0
+        i: int = string_end
+        while i > 0:
+            j: int = row_end
+            while j > 0:
+                answer += self.__tree[i * self.__width + j]
+                j -= j & -j
+            i -= i & -i
+        return answer
+
+    def get_matrix(self) -> list[list[str]]:
+        return self.__matrix
+
+    def set_cell(self, string_index: int, row_index: int, cell: str) -> None:
+        self.__check(string_index, row_index)
+        previous: str = self.__matrix[string_index][row_index]
+        self.__matrix[string_index][row_index] = cell
+        delta: int = cell.count(self.__symbol) - previous.count(self.__symbol)
+        if delta:
+            self.__add(string_index, row_index, delta)
+
+    def count(
+        self, row_start: int, column_start: int, row_end: int, column_end: int
+    ) -> int:
+        self.__check(row_start, column_start)
+        self.__check(row_end, column_end)
+        if row_start > row_end or column_start > column_end:
+            return 0
+        return (
+            self.__prefix(row_end + 1, column_end + 1)
+            - self.__prefix(row_start, column_end + 1)
+            - self.__prefix(row_end + 1, column_start)
+            + self.__prefix(row_start, column_start)
+        )
+
 
-    matrix: list[list[str]] = read_data(amount_of_strings, amount_of_rows)
-    boarders: tuple[int, int, int, int] = read_boarders()
+class TiledSecurityIndex:
+    def __init__(self, grid_path: str, index_path: str) -> None:
+        self.__grid: BinaryMatrix = BinaryMatrix.open(grid_path)
+        try:
+            with open(index_path, "rb") as file:
+                self.__map: mmap = mmap(file.fileno(), 0, access=ACCESS_READ)
+        except (OSError, ValueError):
+            self.__grid.close()
+            raise
+
+        symbol: bytes
+        tile_size: int
+        try:
+            symbol, tile_size = TiledSecurityIndex.__read_header(
+                self.__map,
+                self.__grid.get_shape(),
+                TiledSecurityIndex.get_grid_stamp(grid_path),
+            )
+        except (OSError, ValueError):
+            self.__map.close()
+            self.__grid.close()
+            raise
+        self.__cells: memoryview = self.__grid.get_values()
+        self.__symbol: bytes = symbol
+        self.__amount_of_strings: int
+        self.__amount_of_rows: int
+        self.__amount_of_strings, self.__amount_of_rows = self.__grid.get_shape()
+        self.__tile_size: int = tile_size
+        self.__sums: memoryview | array = memoryview(self.__map)[
+            TILE_HEADER.size :
+        ].cast("q")
+        if byteorder == "big":
+            self.__sums = array("q", self.__sums)
+            self.__sums.byteswap()
+
+    @staticmethod
+    def __read_header(
+        data: mmap, shape: tuple[int, int], stamp: tuple[int, int]
+    ) -> tuple[bytes, int]:
+        magic: bytes
+        symbol: bytes
+        amount_of_strings: int
+        amount_of_rows: int
+        tile_size: int
+        grid_size: int
+        grid_time: int
+        try:
+            (
+                magic,
+                symbol,
+                amount_of_strings,
+                amount_of_rows,
+                tile_size,
+                grid_size,
+                grid_time,
+            ) = TILE_HEADER.unpack_from(data)
+        except StructError:
+            raise ValueError
+        if (
+            magic != TILE_MAGIC
+            or (amount_of_strings, amount_of_rows) != shape
+            or (grid_size, grid_time) != stamp
+            or not 0 < tile_size <= 255
+        ):
+            raise ValueError
+        amount_of_tiles: int = -(-amount_of_strings // tile_size)
+        payload_size: int = (amount_of_tiles + 1) * (amount_of_rows + 1) * 8
+        if len(data) - TILE_HEADER.size != payload_size:
+            raise ValueError
+        return symbol, tile_size
+
+    @staticmethod
+    def get_grid_stamp(grid_path: str) -> tuple[int, int]:
+        status: stat_result = stat(grid_path)
+        return (status.st_size, status.st_mtime_ns)
+
+    @staticmethod
+    def is_current(grid_path: str, index_path: str) -> bool:
+        try:
+            TiledSecurityIndex(grid_path, index_path).close()
+        except (OSError, ValueError):
+            return False
+        return True
+
+    @staticmethod
+    def build(
+        grid_path: str, index_path: str, symbol: str = "S", tile_size: int = TILE_SIZE
+    ) -> None:
+        if not 0 < tile_size <= 255:
+            raise ValueError
+        stamp: tuple[int, int] = TiledSecurityIndex.get_grid_stamp(grid_path)
+        with BinaryMatrix.open(grid_path) as grid:
+            if grid.get_dtype() != "B":
+                raise TypeError
+            temporary: BinaryIO = NamedTemporaryFile(
+                dir=dirname(abspath(index_path)), delete=False
+            )
+            try:
+                with temporary as file:
+                    TiledSecurityIndex.__write_sums(
+                        file, grid, symbol, tile_size, stamp
+                    )
+                replace(temporary.name, index_path)
+            except BaseException:
+                remove(temporary.name)
+                raise
+
+    @staticmethod
+    def __write_sums(
+        file: BinaryIO,
+        grid: BinaryMatrix,
+        symbol: str,
+        tile_size: int,
+        stamp: tuple[int, int],
+    ) -> None:
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = grid.get_shape()
+        table: bytearray = bytearray(256)
+        table[ord(symbol)] = 1
+
+        file.write(
+            TILE_HEADER.pack(
+                TILE_MAGIC,
+                symbol.encode("latin-1"),
+                amount_of_strings,
+                amount_of_rows,
+                tile_size,
+                *stamp,
+            )
+        )
+        file.write(bytes(8 * (amount_of_rows + 1)))
+
+        column_totals: array = array("q", [0]) * amount_of_rows
+        cells: memoryview = grid.get_values()
+        tile_start: int
+        for tile_start in range(0, amount_of_strings, tile_size):
+            tile_end: int = min(tile_start + tile_size, amount_of_strings)
+            flags: int = 0
+            string_index: int
+            for string_index in range(tile_start, tile_end):
+                start: int = string_index * amount_of_rows
+                string: bytes = bytes(cells[start : start + amount_of_rows])
+                flags += int.from_bytes(string.translate(table), "little")
+            tile_totals: bytes = flags.to_bytes(amount_of_rows, "little")
+            column_totals = array("q", map(add, column_totals, tile_totals))
+            sums: array = array("q", [0, *accumulate(column_totals)])
+            if byteorder == "big":
+                sums.byteswap()
+            file.write(sums.tobytes())
+
+    def __get_sum(self, tile_index: int, row_index: int) -> int:
+        return self.__sums[tile_index * (self.__amount_of_rows + 1) + row_index]
+
+    def __count_above(
+        self, string_end: int, column_start: int, column_end: int
+    ) -> int:
+        tile_index: int = string_end // self.__tile_size
+        answer: int = self.__get_sum(tile_index, column_end + 1) - self.__get_sum(
+            tile_index, column_start
+        )
+        string_index: int
+        for string_index in range(tile_index * self.__tile_size, string_end):
+            start: int = string_index * self.__amount_of_rows
+            answer += bytes(
+                self.__cells[start + column_start : start + column_end + 1]
+            ).count(self.__symbol)
+        return answer
+
+    def count(
+        self, row_start: int, column_start: int, row_end: int, column_end: int
+    ) -> int:
+        if (
+            min(row_start, column_start, row_end, column_end) < 0
+            or max(row_start, row_end) >= self.__amount_of_strings
+            or max(column_start, column_end) >= self.__amount_of_rows
+        ):
+            raise IndexError
+        if row_start > row_end or column_start > column_end:
+            return 0
+        return self.__count_above(
+            row_end + 1, column_start, column_end
+        ) - self.__count_above(row_start, column_start, column_end)
+
+    def close(self) -> None:
+        self.__cells.release()
+        if isinstance(self.__sums, memoryview):
+            self.__sums.release()
+        self.__map.close()
+        self.__grid.close()
+
+
+def parse_arguments(arguments: list[str] | None = None) -> Namespace:
+    parser: ArgumentParser = ArgumentParser()
+    parser.add_argument("--path", default=None)
+    parser.add_argument("--batch", action="store_true")
+    parser.add_argument("--symbols", action="store_true")
+    parser.add_argument("--updates", action="store_true")
+    parser.add_argument("--index", default=None)
+    namespace: Namespace = parser.parse_args(arguments)
+    if namespace.index is not None and namespace.path is None:
+        parser.error("--index requires --path")
+    return namespace
+
+
+def main() -> None:
+    arguments: Namespace = parse_arguments()
+
+    if arguments.index is not None:
+        if not (
+            exists(arguments.index)
+            and TiledSecurityIndex.is_current(arguments.path, arguments.index)
+        ):
+            TiledSecurityIndex.build(arguments.path, arguments.index)
+        tiled_index: TiledSecurityIndex = TiledSecurityIndex(
+            arguments.path, arguments.index
+        )
+        amount_of_queries: int = parse_length(input())
+        for _ in range(amount_of_queries):
+            print(tiled_index.count(*read_boarders()))
+        tiled_index.close()
+        return
+
+    matrix: list[list[str]]
+    read_line: Callable[[], str]
+    if arguments.path is not None:
+        with BinaryMatrix.open(arguments.path) as binary:
+            matrix = binary.to_str_matrix()
+        read_line = input
+    else:
+        reader: BulkReader = BulkReader()
+        amount_of_strings: int
+        amount_of_rows: int
+        amount_of_strings, amount_of_rows = reader.read_amounts()
+        matrix = reader.read_str_matrix(amount_of_strings, amount_of_rows)
+        read_line = reader.read_line
+
+    if arguments.updates:
+        grid: SecurityGrid = SecurityGrid(matrix)
+        amount_of_operations: int = parse_length(read_line())
+        for _ in range(amount_of_operations):
+            operation: list[str] = read_line().split()
+            if operation[:1] == ["?"]:
+                print(grid.count(*parse_boarders(" ".join(operation[1:]))))
+            elif operation[:1] == ["="]:
+                grid.set_cell(*parse_update(operation[1:]))
+            else:
+                raise ValueError
+        return
+
+    if arguments.symbols:
+        region_index: RegionIndex = RegionIndex(matrix)
+        amount_of_symbol_queries: int = parse_length(read_line())
+        for _ in range(amount_of_symbol_queries):
+            boarders: tuple[int, int, int, int]
+            symbols: list[str]
+            boarders, symbols = parse_symbol_query(read_line())
+            print(*region_index.count(symbols, *boarders))
+        return
+
+    if arguments.batch:
+        index: SecurityIndex = SecurityIndex(matrix)
+        amount_of_queries = parse_length(read_line())
+        print(
+            "\n".join(
+                str(index.count(*parse_boarders(read_line())))
+                for _ in range(amount_of_queries)
+            )
+        )
+        return
 
+    boarders = parse_boarders(read_line())
     print(find_security_in_matrix(slice_matrix(matrix, *boarders)))
 
 
@@ -132,15 +630,18 @@ class TestInputData(TestCase):
         mock_input.assert_called()
 
 
+TEST_MATRIX: tuple[str, ...] = (
+    "NMb1RLNKS",
+    "NmNOR2PMN",
+    "2KLSMULaP",
+    "SUssRQLKL",
+    "PjROUTO0Q",
+)
+
+
 class TestMatrix(TestCase):
     def setUp(self):
-        self.__matrix: list[list[str]] = [
-            ["N", "M", "b", "1", "R", "L", "N", "K", "S"],
-            ["N", "m", "N", "O", "R", "2", "P", "M", "N"],
-            ["2", "K", "L", "S", "M", "U", "L", "a", "P"],
-            ["S", "U", "s", "s", "R", "Q", "L", "K", "L"],
-            ["P", "j", "R", "O", "U", "T", "O", "0", "Q"],
-        ]
+        self.__matrix: list[list[str]] = [list(string) for string in TEST_MATRIX]
 
     def test_slice_huge_borders(self) -> None:
         with self.assertRaises(IndexError):
@@ -159,3 +660,200 @@ class TestMatrix(TestCase):
 
     def test_find_security(self) -> None:
         self.assertEqual(find_security_in_matrix(self.__matrix), 3)
+
+    def test_multi_symbol_cells(self) -> None:
+        matrix: list[list[str]] = [["S", "a", "SS"], ["S", "S", "b"]]
+        self.assertEqual(find_security_in_matrix(matrix), 5)
+        self.assertEqual(SecurityIndex(matrix).count(0, 0, 1, 2), 5)
+        self.assertEqual(RegionIndex(matrix).count(["S", "a"], 0, 1, 1, 2), [3, 1])
+        grid: SecurityGrid = SecurityGrid(matrix)
+        self.assertEqual(grid.count(0, 0, 1, 2), 5)
+        grid.set_cell(0, 2, "a")
+        self.assertEqual(grid.count(0, 0, 1, 2), 3)
+
+
+class TestSecurityIndex(TestCase):
+    def setUp(self):
+        self.__matrix: list[list[str]] = [list(string) for string in TEST_MATRIX]
+        self.__index: SecurityIndex = SecurityIndex(self.__matrix)
+
+    def test_count_matches_slices(self) -> None:
+        row_start: int
+        row_end: int
+        column_start: int
+        column_end: int
+        for row_start in range(5):
+            for row_end in range(row_start, 5):
+                for column_start in range(9):
+                    for column_end in range(column_start, 9):
+                        boarders: tuple[int, int, int, int] = (
+                            row_start,
+                            column_start,
+                            row_end,
+                            column_end,
+                        )
+                        sliced: list[list[str]] = slice_matrix(self.__matrix, *boarders)
+                        self.assertEqual(
+                            self.__index.count(*boarders),
+                            find_security_in_matrix(sliced),
+                        )
+
+    def test_count_huge_borders(self) -> None:
+        with self.assertRaises(IndexError):
+            self.__index.count(20, 20, 30, 30)
+
+    def test_parse_length(self) -> None:
+        self.assertEqual(parse_length("12"), 12)
+        with self.assertRaises(TypeError):
+            parse_length("abc")
+
+
+class TestRegionIndex(TestCase):
+    def setUp(self):
+        self.__matrix: list[list[str]] = [list(string) for string in TEST_MATRIX]
+        self.__index: RegionIndex = RegionIndex(self.__matrix)
+
+    def test_count(self) -> None:
+        self.assertEqual(
+            self.__index.count(["S", "L", "R", "x"], 1, 2, 4, 6), [1, 3, 3, 0]
+        )
+        self.assertEqual(self.__index.count("NS", 0, 0, 4, 8), [5, 3])
+
+    def test_count_matches_slices(self) -> None:
+        symbols: set[str] = {cell for string in self.__matrix for cell in string}
+        row_start: int
+        row_end: int
+        for row_start in range(5):
+            for row_end in range(row_start, 5):
+                sliced: list[list[str]] = slice_matrix(
+                    self.__matrix, row_start, 1, row_end, 7
+                )
+                self.assertEqual(
+                    self.__index.count(symbols, row_start, 1, row_end, 7),
+                    [sum(row.count(symbol) for row in sliced) for symbol in symbols],
+                )
+
+    def test_count_huge_borders(self) -> None:
+        with self.assertRaises(IndexError):
+            self.__index.count("S", 0, 0, 5, 8)
+
+    def test_parse_symbol_query(self) -> None:
+        self.assertEqual(parse_symbol_query("1 2 3 4 S G"), ((0, 1, 2, 3), ["S", "G"]))
+
+
+class TestSecurityGrid(TestCase):
+    def setUp(self):
+        self.__matrix: list[list[str]] = [list(string) for string in TEST_MATRIX]
+        self.__grid: SecurityGrid = SecurityGrid(self.__matrix)
+
+    def __check_all_regions(self) -> None:
+        row_start: int
+        row_end: int
+        for row_start in range(5):
+            for row_end in range(row_start, 5):
+                sliced: list[list[str]] = slice_matrix(
+                    self.__grid.get_matrix(), row_start, 2, row_end, 8
+                )
+                self.assertEqual(
+                    self.__grid.count(row_start, 2, row_end, 8),
+                    find_security_in_matrix(sliced),
+                )
+
+    def test_count(self) -> None:
+        self.assertEqual(self.__grid.count(0, 0, 4, 8), 3)
+        self.__check_all_regions()
+
+    def test_set_cell(self) -> None:
+        self.__grid.set_cell(4, 4, "S")
+        self.__grid.set_cell(0, 8, "n")
+        self.__grid.set_cell(2, 3, "S")
+        self.assertEqual(self.__grid.count(0, 0, 4, 8), 3)
+        self.assertEqual(self.__matrix[4][4], "S")
+        self.__check_all_regions()
+
+    def test_set_cell_out_of_range(self) -> None:
+        with self.assertRaises(IndexError):
+            self.__grid.set_cell(5, 0, "S")
+
+    def test_parse_update(self) -> None:
+        self.assertEqual(parse_update(["2", "3", "S"]), (1, 2, "S"))
+        with self.assertRaises(TypeError):
+            parse_update(["a", "3", "S"])
+
+
+class TestTiledSecurityIndex(TestCase):
+    def setUp(self):
+        self.__matrix: list[list[str]] = [
+            list(string) for string in (*TEST_MATRIX, "SSROUSO0S")
+        ]
+        self.__directory: TemporaryDirectory = TemporaryDirectory()
+        self.__grid_path: str = f"{self.__directory.name}/grid.bin"
+        self.__index_path: str = f"{self.__directory.name}/grid.idx"
+        with open(self.__grid_path, "wb") as file:
+            BinaryMatrix.write(file, self.__matrix)
+        TiledSecurityIndex.build(self.__grid_path, self.__index_path, tile_size=2)
+        self.__index: TiledSecurityIndex = TiledSecurityIndex(
+            self.__grid_path, self.__index_path
+        )
+
+    def tearDown(self) -> None:
+        self.__index.close()
+        self.__directory.cleanup()
+
+    def test_count_matches_slices(self) -> None:
+        row_start: int
+        row_end: int
+        column_start: int
+        for row_start in range(6):
+            for row_end in range(row_start, 6):
+                for column_start in range(9):
+                    sliced: list[list[str]] = slice_matrix(
+                        self.__matrix, row_start, column_start, row_end, 8
+                    )
+                    self.assertEqual(
+                        self.__index.count(row_start, column_start, row_end, 8),
+                        find_security_in_matrix(sliced),
+                    )
+
+    def test_count_huge_borders(self) -> None:
+        with self.assertRaises(IndexError):
+            self.__index.count(0, 0, 6, 8)
+
+    def test_stale_index(self) -> None:
+        self.assertTrue(
+            TiledSecurityIndex.is_current(self.__grid_path, self.__index_path)
+        )
+        self.__matrix[0][0] = "S"
+        with open(self.__grid_path, "wb") as file:
+            BinaryMatrix.write(file, self.__matrix)
+        utime(self.__grid_path, ns=(0, 0))
+        self.assertFalse(
+            TiledSecurityIndex.is_current(self.__grid_path, self.__index_path)
+        )
+        with self.assertRaises(ValueError):
+            TiledSecurityIndex(self.__grid_path, self.__index_path)
+
+    def test_truncated_index(self) -> None:
+        with open(self.__index_path, "rb") as file:
+            data: bytes = file.read()
+        files: list[str] = sorted(listdir(self.__directory.name))
+        self.assertEqual(files, ["grid.bin", "grid.idx"])
+
+        sizes: tuple[int, ...] = (0, TILE_HEADER.size - 1, TILE_HEADER.size)
+        size: int
+        for size in (*sizes, len(data) - 3, len(data) - 8):
+            with open(self.__index_path, "wb") as file:
+                file.write(data[:size])
+            self.assertFalse(
+                TiledSecurityIndex.is_current(self.__grid_path, self.__index_path)
+            )
+            with self.assertRaises(ValueError):
+                TiledSecurityIndex(self.__grid_path, self.__index_path)
+
+    def test_index_without_path(self) -> None:
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            parse_arguments(["--index", self.__index_path])
+
+    def test_incorrect_tile_size(self) -> None:
+        with self.assertRaises(ValueError):
+            TiledSecurityIndex.build(self.__grid_path, self.__index_path, tile_size=256)